@@ -0,0 +1,87 @@
+import os, sys, time, argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import numpy as np
+from PIL import Image, ImageChops, ImageOps
+from lib.utils.events.poketwo_spawns import PokemonImageBuilder
+
+
+def timed(fn, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def difference(a, b):
+    diff = np.asarray(ImageChops.difference(a.convert("RGB"), b.convert("RGB")))
+    return int(diff.max()), float(diff.mean())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare layered card rendering against compose_frame")
+    parser.add_argument("--sprite", default="data/bot/images/bot.png")
+    parser.add_argument("--name", default="Pikachu")
+    parser.add_argument("--alt", default="Pikachu | ピカチュウ")
+    parser.add_argument("--frames", type=int, default=12, help="frame count for the animated background case")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    builder = PokemonImageBuilder()
+    sprite = Image.open(args.sprite).convert("RGBA")
+    types = [t.capitalize() for t in list(builder.type_icons)[:2]] or ["Normal"]
+    bg_frames, _ = builder.prepare_background_frames(builder.get_background_color(types))
+    animated = [bg_frames[0].copy() for _ in range(args.frames)]
+
+    def cold():
+        builder.text_layers.clear()
+        return builder.render_frames(types, sprite, args.name, args.alt)
+
+    builder.static_layer(types)
+    cases = [
+        ("static, uncached text", lambda: [builder.compose_frame(bg_frames[0], sprite, args.name, args.alt, types)], cold),
+        ("static", lambda: [builder.compose_frame(bg_frames[0], sprite, args.name, args.alt, types)],
+         lambda: builder.render_frames(types, sprite, args.name, args.alt)),
+        (f"{args.frames} frames", lambda: [builder.compose_frame(f, sprite, args.name, args.alt, types) for f in animated],
+         lambda: builder.render_frames(types, sprite, args.name, args.alt, animated)),
+    ]
+    def fake_gif():
+        base = Image.open(args.sprite).convert("RGB").resize((420, 420))
+        frames = [ImageOps.posterize(base.rotate(i * 360 / args.frames), 6) for i in range(args.frames)]
+        buf = io.BytesIO()
+        frames[0].save(buf, format="GIF", save_all=True, append_images=frames[1:], duration=60, loop=0)
+        return buf.getvalue()
+
+    gif_bytes = fake_gif()
+    background = builder.process_background(Image.open(io.BytesIO(gif_bytes)))
+    gif_frames, durations = background[:2]
+
+    def old_gif():
+        frames = [builder.compose_frame(f, sprite, args.name, args.alt, types) for f in gif_frames]
+        frames[0].save(io.BytesIO(), format="GIF", save_all=True, append_images=frames[1:], duration=durations, loop=0, disposal=2, transparency=0)
+
+    def new_gif():
+        builder.encode_animated(background, types, sprite, args.name, args.alt, io.BytesIO())
+
+    def new_png():
+        builder.render_frames(types, sprite, args.name, args.alt)[0].save(io.BytesIO(), format="PNG")
+
+    t_process, _ = timed(lambda: builder.process_background(Image.open(io.BytesIO(gif_bytes))), 3)
+    t_old, _ = timed(old_gif, args.repeat)
+    t_new, _ = timed(new_gif, args.repeat)
+    t_png, _ = timed(new_png, args.repeat)
+    print(f"gif encode ({len(gif_frames)} frames): per-spawn compose + save {t_old * 1000:.1f}ms | cached background {t_new * 1000:.1f}ms | x{t_old / t_new:.1f}")
+    print(f"static png encode {t_png * 1000:.1f}ms, first-time background processing {t_process * 1000:.1f}ms")
+
+    for label, old, new in cases:
+        t_old, old_frames = timed(old, args.repeat)
+        t_new, new_frames = timed(new, args.repeat)
+        peak, mean = difference(old_frames[0], new_frames[0])
+        print(f"{label}: compose_frame {t_old * 1000:.2f}ms | layered {t_new * 1000:.2f}ms | x{t_old / t_new:.1f} | max diff {peak}, mean diff {mean:.3f}")
+
+
+if __name__ == "__main__":
+    main()
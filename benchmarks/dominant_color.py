@@ -0,0 +1,64 @@
+import os, sys, glob, time, argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from colorthief import ColorThief
+from lib.utils.color import get_palette
+
+
+def timed(fn, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def distance(a, b):
+    return max(abs(x - y) for x, y in zip(a, b))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare lib.utils.color against ColorThief on bundled artwork")
+    parser.add_argument("paths", nargs="*", default=["data"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--colors", type=int, default=5)
+    parser.add_argument("--max-size", type=int, default=None)
+    parser.add_argument("--tolerance", type=int, default=8)
+    parser.add_argument("--min-speedup", type=float, default=10.0)
+    args = parser.parse_args()
+
+    files = []
+    for path in args.paths:
+        if os.path.isfile(path):
+            files.append(path)
+        else:
+            for ext in ("png", "jpg", "jpeg", "gif", "webp"):
+                files.extend(glob.glob(os.path.join(path, "**", f"*.{ext}"), recursive=True))
+    if not files:
+        sys.exit("no images found")
+
+    total_ref = total_new = 0.0
+    failures = 0
+    for f in sorted(files):
+        try:
+            t_ref, ref = timed(lambda: ColorThief(f).get_palette(color_count=args.colors, quality=1), args.repeat)
+        except Exception as e:
+            print(f"skip {f}: {e}")
+            continue
+        t_new, new = timed(lambda: get_palette(f, args.colors, 1, args.max_size), args.repeat)
+        diff = distance(ref[0], new[0])
+        ok = diff <= args.tolerance
+        failures += not ok
+        total_ref += t_ref
+        total_new += t_new
+        print(f"{'ok  ' if ok else 'FAIL'} {f}: colorthief {t_ref * 1000:.1f}ms {ref[0]} | numpy {t_new * 1000:.1f}ms {new[0]} | x{t_ref / t_new:.1f}")
+
+    speedup = total_ref / total_new if total_new else 0
+    print(f"\n{len(files)} images, colorthief {total_ref * 1000:.1f}ms, numpy {total_new * 1000:.1f}ms, speedup x{speedup:.1f}, {failures} outside tolerance")
+    if failures or speedup < args.min_speedup:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,496 @@
+import os, sys, csv, json, time, random, shutil, asyncio, hashlib, argparse, tempfile, threading
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CWD = os.getcwd()
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import requests
+from aiohttp import web
+from pymongo.errors import OperationFailure
+from PIL import Image, ImageDraw
+
+import bot.cogs.register as register_cog
+import bot.events.pokemon_spawns as spawn_cog
+import lib.utils.events.poketwo_spawns as spawns
+from lib.config.bot import http_config
+from lib.config.spawns import spawn_config
+from lib.utils.http import HTTPClient
+
+
+# Replays recorded spawns through PoketwoSpawnDetector.output_prediction with local
+# stand-ins for Discord, Mongo and the HTTP endpoints it talks to.
+#
+#   python benchmarks/spawn_replay.py synth bench_data --count 200
+#   python benchmarks/spawn_replay.py run bench_data/events.jsonl --concurrency 8
+#   python benchmarks/spawn_replay.py run bench_data/events.jsonl --rate 40   # open loop through the spawn scheduler
+#
+# Production spawns are captured in the same format by setting
+# spawn_config["replay"]["record_path"] or with the owner command `record_spawns <path>`.
+
+TYPES = ["normal", "fire", "water", "grass", "electric", "ice", "fighting", "poison", "ground",
+         "flying", "psychic", "bug", "rock", "ghost", "dragon", "dark", "steel", "fairy"]
+REGIONS = ["kanto", "johto", "hoenn", "sinnoh", "unova", "kalos", "alola", "galar", "paldea"]
+
+
+class MemoryCursor:
+    def __init__(self, docs, latency):
+        self.docs = docs
+        self.latency = latency
+
+    async def to_list(self, length=None):
+        await asyncio.sleep(self.latency)
+        return self.docs if length is None else self.docs[:length]
+
+
+class MemoryCollection:
+    def __init__(self, name, database):
+        self.name = name
+        self.database = database
+        self.docs = []
+
+    def __getitem__(self, name):
+        return self.database[f"{self.name}.{name}"]
+
+    @staticmethod
+    def matches(doc, query):
+        for key, value in (query or {}).items():
+            if isinstance(value, dict) and "$in" in value:
+                if doc.get(key) not in value["$in"]:
+                    return False
+            elif isinstance(value, dict) and "$gte" in value:
+                if doc.get(key) is None or doc[key] < value["$gte"]:
+                    return False
+            elif doc.get(key) != value:
+                return False
+        return True
+
+    def find(self, query=None, projection=None):
+        return MemoryCursor([dict(d) for d in self.docs if self.matches(d, query)], self.database.latency)
+
+    async def find_one(self, query=None):
+        await asyncio.sleep(self.database.latency)
+        return next((dict(d) for d in self.docs if self.matches(d, query)), None)
+
+    async def insert_one(self, doc):
+        doc.setdefault("_id", len(self.docs) + 1)
+        self.docs.append(doc)
+
+    async def update_one(self, query, update, upsert=False):
+        doc = next((d for d in self.docs if self.matches(d, query)), None)
+        if doc is None:
+            if not upsert:
+                return
+            doc = dict(query)
+            await self.insert_one(doc)
+        for key, value in update.get("$set", {}).items():
+            doc[key] = value
+        for key, value in update.get("$push", {}).items():
+            doc.setdefault(key, []).append(value)
+        for key, value in update.get("$pull", {}).items():
+            doc[key] = [v for v in doc.get(key, []) if v != value]
+        for key in update.get("$unset", {}):
+            doc.pop(key, None)
+
+    async def insert_many(self, docs):
+        for doc in docs:
+            await self.insert_one(doc)
+
+    async def delete_many(self, query):
+        self.docs = [d for d in self.docs if not self.matches(d, query)]
+
+    async def create_index(self, key):
+        return f"{key}_1"
+
+
+class MemoryDatabase:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.collections = {}
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = MemoryCollection(name, self)
+        return self.collections[name]
+
+    def watch(self, *args, **kwargs):
+        return MemoryChangeStream()
+
+
+class MemoryChangeStream:
+    # Like a standalone mongod: opening the stream is lazy and the first read fails
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def try_next(self):
+        message = "The $changeStream stage is only supported on replica sets"
+        raise OperationFailure(message, code=40573, details={"ok": 0.0, "errmsg": message, "code": 40573, "codeName": "Location40573"})
+
+
+class MemoryClient:
+    latency = 0.0
+    databases = {}
+
+    def __init__(self, uri=None, **kwargs):
+        pass
+
+    def __getitem__(self, name):
+        if name not in self.databases:
+            self.databases[name] = MemoryDatabase(self.latency)
+        return self.databases[name]
+
+
+class FakeUser:
+    def __init__(self, id):
+        self.id = id
+        self.bot = False
+
+
+class FakeGuild:
+    def __init__(self, id, member_count):
+        self.id = id
+        self.members = {uid: FakeUser(uid) for uid in range(1, member_count + 1)}
+
+    def get_member(self, uid):
+        return self.members.get(uid)
+
+
+class FakeChannel:
+    def __init__(self, id, latency=0.0):
+        self.id = id
+        self.latency = latency
+        self.sends = []
+
+    async def send(self, content=None, file=None, view=None, reference=None, **kwargs):
+        size = 0
+        if file is not None:
+            size = len(file.fp.read())
+        await asyncio.sleep(self.latency)
+        self.sends.append({"content": content or "", "bytes": size, "reference": getattr(reference, "id", None), "at": time.perf_counter()})
+
+
+class FakeMessage:
+    def __init__(self, id, guild, channel):
+        self.id = id
+        self.guild = guild
+        self.channel = channel
+        self.author = FakeUser(0)
+        self.embeds = []
+
+
+class FakeBot:
+    def __init__(self):
+        self.http_client = HTTPClient(**http_config)
+        self.metrics = {}
+        self.dynamic_items = set()
+
+    def add_dynamic_items(self, *items):
+        self.dynamic_items.update(items)
+
+    def remove_dynamic_items(self, *items):
+        self.dynamic_items.difference_update(items)
+
+
+class UrlPredictor:
+    # Stands in for the autonamer model as it is today: predict(url) downloads the image itself
+    labels = {}
+    delay = 0.0
+
+    def predict(self, image_url):
+        content = requests.get(image_url, timeout=10).content
+        time.sleep(self.delay)
+        return self.labels[hashlib.sha256(content).hexdigest()]
+
+
+class SerialPredictor(UrlPredictor):
+    # Takes the bytes the cog already downloaded, one image per call
+    def predict_bytes(self, image_bytes):
+        time.sleep(self.delay)
+        return self.labels[hashlib.sha256(image_bytes).hexdigest()]
+
+
+class RecordedPredictor(SerialPredictor):
+    # A model with a real batched forward pass: one delay for the whole batch
+    def predict_batch(self, images):
+        time.sleep(self.delay)
+        return [self.labels[hashlib.sha256(image).hexdigest()] for image in images]
+
+
+PREDICTORS = {"recorded": RecordedPredictor, "serial": SerialPredictor, "url": UrlPredictor}
+
+
+def init_recorded_worker(state):
+    # Workers start from a fresh interpreter (forkserver), so everything run() patched is handed over here
+    UrlPredictor.labels, UrlPredictor.delay = state["labels"], state["delay"]
+    spawns.PokemonImageBuilder.ARTWORK_URL = state["artwork_url"]
+    for section, values in state["config"].items():
+        spawn_config[section].update(values)
+    spawns._spawn_worker["predictor"] = PREDICTORS[state["predictor"]]()
+    spawns._spawn_worker["image_builder"] = spawns.PokemonImageBuilder()
+
+
+def image_digest(events_dir, name):
+    with open(os.path.join(events_dir, name), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def load_events(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def seed_mongo(db, events, args):
+    rng = random.Random(args.seed)
+    species = sorted({e["slug"].lower() for e in events if e.get("slug")})
+    with open("data/bot/cogs/register/pokemon_names.csv", encoding="utf-8") as f:
+        species += [row["name"].lower() for row in csv.DictReader(f)]
+    pokemon = db["pokemon"]
+    for uid in rng.sample(range(1, args.members + 1), min(args.subscribers, args.members)):
+        pokemon["shiny_hunt"].docs.append({"_id": f"s{uid}", "user_id": uid, "pokemon": rng.sample(species, 1)})
+        pokemon["collection"].docs.append({"_id": f"c{uid}", "user_id": uid, "pokemon": rng.sample(species, 20)})
+        pokemon["type_ping_types"].docs.append({"_id": f"t{uid}", "user_id": uid, "type": rng.choice(TYPES)})
+        pokemon["quest_ping"].docs.append({"_id": f"q{uid}", "user_id": uid, "regions": rng.sample(REGIONS, 2)})
+    for guild_id in {e["guild_id"] for e in events}:
+        pokemon["server_config"].docs.append({"_id": f"g{guild_id}", "guild_id": guild_id, "rare_role": 111, "regional_role": 222})
+
+
+async def start_fixture_server(events_dir, artwork_dir, artwork_latency=0.0):
+    placeholders = {}
+
+    async def spawn_image(request):
+        path = os.path.join(events_dir, request.match_info["name"])
+        if not os.path.isfile(path):
+            raise web.HTTPNotFound()
+        return web.FileResponse(path)
+
+    async def artwork(request):
+        name = request.match_info["name"]
+        await asyncio.sleep(artwork_latency)
+        path = os.path.join(artwork_dir, name) if artwork_dir else None
+        if path and os.path.isfile(path):
+            return web.FileResponse(path)
+        if name not in placeholders:
+            seed = sum(map(ord, name))
+            img = Image.new("RGBA", (475, 475), (0, 0, 0, 0))
+            ImageDraw.Draw(img).ellipse((60, 60, 415, 415), fill=(seed * 37 % 256, seed * 59 % 256, seed * 83 % 256, 255))
+            buf = spawns.io.BytesIO()
+            img.save(buf, format="PNG")
+            placeholders[name] = buf.getvalue()
+        return web.Response(body=placeholders[name], content_type="image/png")
+
+    app = web.Application()
+    app.router.add_get("/spawns/{name:.+}", spawn_image)
+    app.router.add_get("/artwork/{name}", artwork)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+class FixtureThread(threading.Thread):
+    # Serves the fixtures from their own loop so a busy bot loop cannot stall its "CDN" responses
+    def __init__(self, *args):
+        super().__init__(daemon=True)
+        self.args = args
+        self.loop = asyncio.new_event_loop()
+        self.ready = threading.Event()
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        self.runner, self.port = self.loop.run_until_complete(start_fixture_server(*self.args))
+        self.ready.set()
+        self.loop.run_forever()
+        self.loop.run_until_complete(self.runner.cleanup())
+
+    def start(self):
+        super().start()
+        self.ready.wait()
+        return self
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.join()
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run(args):
+    events = load_events(args.events)
+    events_dir = os.path.dirname(os.path.abspath(args.events))
+    scratch = tempfile.mkdtemp(prefix="spawn_replay_")
+    fixtures = FixtureThread(events_dir, args.artwork_dir, args.artwork_ms / 1000).start()
+    base = f"http://127.0.0.1:{fixtures.port}"
+
+    spawns.PokemonImageBuilder.ARTWORK_URL = f"{base}/artwork/"
+    spawn_config["workers"]["cpu_executor"] = args.cpu_executor
+    spawn_config["workers"]["max_queue"] = max(spawn_config["workers"]["max_queue"], args.concurrency * 2)
+    spawn_config["artwork"].update(cache_dir=os.path.join(scratch, "artwork"), source_dir=None)
+    spawn_config["prediction_cache"]["snapshot_path"] = None
+    spawn_config["card_cache"]["disk_dir"] = None
+    spawn_config["replay"]["record_path"] = None
+    spawn_config["scheduler"]["workers"] = args.concurrency
+    if args.deadline:
+        spawn_config["scheduler"].update(deadline=args.deadline, degrade_after=args.deadline * 0.4)
+    if args.cold:
+        spawn_config["prediction_cache"]["max_entries"] = 0
+        spawn_config["card_cache"]["max_entries"] = 0
+    if args.predictor in PREDICTORS:
+        spawn_config["workers"].update(initializer=init_recorded_worker, initargs=({
+            "predictor": args.predictor,
+            "labels": {image_digest(events_dir, e["image"]): (e["slug"], e.get("confidence", 100.0)) for e in events},
+            "delay": args.predict_ms / 1000,
+            "artwork_url": spawns.PokemonImageBuilder.ARTWORK_URL,
+            "config": {section: spawn_config[section] for section in ("artwork", "emoji")},
+        },))
+
+    MemoryClient.latency = args.mongo_ms / 1000
+    seed_mongo(MemoryClient()["Commands"], events, args)
+    register_cog.AsyncIOMotorClient = MemoryClient
+    spawn_cog.AsyncIOMotorClient = MemoryClient
+
+    fake_bot = FakeBot()
+    cog = spawn_cog.PoketwoSpawnDetector(fake_bot)
+    colors = os.path.join(scratch, "dominant_colors.csv")
+    if os.path.exists(cog.filepaths["colors"]):
+        shutil.copy(cog.filepaths["colors"], colors)
+    cog.pokemon_utils.color_table = spawns.DominantColorTable(colors)
+    await cog.cog_load()
+    while not cog.subscriptions.ready:
+        await asyncio.sleep(0.01)
+
+    guilds = {gid: FakeGuild(gid, args.members) for gid in {e["guild_id"] for e in events}}
+    channels = {cid: FakeChannel(cid, args.send_ms / 1000) for cid in {e["channel_id"] for e in events}}
+    jobs = [(i, e) for i, e in enumerate(events * args.repeat)]
+
+    if args.warmup:
+        e = events[0]
+        await cog.output_prediction(FakeMessage(-1, guilds[e["guild_id"]], channels[e["channel_id"]]), f"{base}/spawns/{e['image']}")
+        cog.metrics.reset()
+        for channel in channels.values():
+            channel.sends.clear()
+
+    latencies = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def replay(i, event):
+        message = FakeMessage(i, guilds[event["guild_id"]], channels[event["channel_id"]])
+        async with semaphore:
+            start = time.perf_counter()
+            await cog.output_prediction(message, f"{base}/spawns/{event['image']}")
+            latencies.append(time.perf_counter() - start)
+
+    async def arrive():
+        submitted = {}
+        for i, event in jobs:
+            submitted[i] = time.perf_counter()
+            cog.scheduler.submit(FakeMessage(i, guilds[event["guild_id"]], channels[event["channel_id"]]), f"{base}/spawns/{event['image']}")
+            await asyncio.sleep(1 / args.rate)
+        while cog.scheduler.queue.qsize() or cog.scheduler.active:
+            await asyncio.sleep(0.01)
+        latencies.extend(s["at"] - submitted[s["reference"]] for c in channels.values() for s in c.sends)
+
+    cog.scheduler.reset()
+    start = time.perf_counter()
+    await (arrive() if args.rate else asyncio.gather(*(replay(i, e) for i, e in jobs)))
+    wall = time.perf_counter() - start
+
+    sends = [s for c in channels.values() for s in c.sends]
+    failures = sum("Failed to process spawn" in s["content"] for s in sends)
+    result = {
+        "spawns": len(jobs),
+        "concurrency": args.concurrency,
+        "wall": wall,
+        "throughput": len(jobs) / wall if wall else 0.0,
+        "latency": {q: percentile(latencies, p) for q, p in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("max", 1.0))},
+        "failures": failures,
+        "stages": cog.metrics.summary(),
+        "scheduler": cog.scheduler.summary() if args.rate else None,
+    }
+
+    load = f"{args.rate:g}/s arrival" if args.rate else f"concurrency {args.concurrency}"
+    print(f"{result['spawns']} spawns at {load} in {wall:.2f}s: {result['throughput']:.1f} spawns/s, {failures} failed")
+    if args.rate:
+        queue = result["scheduler"]
+        print(" ".join(f"{k}={queue[k]}" for k in ("completed", "degraded", "shed_full", "shed_expired", "timed_out", "failed")))
+    print("latency " + "  ".join(f"{q}={v * 1000:.1f}ms" for q, v in result["latency"].items()))
+    print(f"\n{'stage':<14}{'n':>7}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'failed':>8}{'cancel':>8}")
+    for name, s in sorted(result["stages"].items(), key=lambda kv: -kv[1]["mean"]):
+        print(f"{name:<14}{s['count']:>7}{s['mean'] * 1000:>9.1f}ms{s['p50'] * 1000:>8.1f}ms{s['p90'] * 1000:>8.1f}ms{s['p99'] * 1000:>8.1f}ms{s['failed']:>8}{s['cancelled']:>8}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    await cog.cog_unload()
+    await fake_bot.http_client.close()
+    fixtures.stop()
+    shutil.rmtree(scratch, ignore_errors=True)
+
+
+def synth(args):
+    rng = random.Random(args.seed)
+    with open("data/bot/cogs/register/descriptions.csv", encoding="utf-8") as f:
+        species = [row["slug"].lower() for row in csv.DictReader(f) if row.get("slug")]
+    image_dir = os.path.join(args.out, "images")
+    os.makedirs(image_dir, exist_ok=True)
+    with open(os.path.join(args.out, "events.jsonl"), "w", encoding="utf-8") as f:
+        for i in range(args.count):
+            img = Image.new("RGB", (800, 500), tuple(rng.randrange(256) for _ in range(3)))
+            ImageDraw.Draw(img).ellipse((250, 100, 550, 400), fill=tuple(rng.randrange(256) for _ in range(3)))
+            name = f"images/spawn_{i:05d}.jpg"
+            img.save(os.path.join(args.out, name), quality=85)
+            event = {"image": name, "guild_id": 1 + i % args.guilds, "channel_id": 100 + i % args.guilds,
+                     "slug": rng.choice(species), "confidence": round(rng.uniform(60, 100), 2), "ts": time.time()}
+            f.write(json.dumps(event) + "\n")
+    print(f"Wrote {args.count} events to {os.path.join(args.out, 'events.jsonl')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded spawns through the spawn pipeline")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("run", help="replay an events.jsonl file")
+    p.add_argument("events")
+    p.add_argument("--concurrency", type=int, default=4)
+    p.add_argument("--repeat", type=int, default=1)
+    p.add_argument("--rate", type=float, default=None, help="submit spawns at this many per second through the scheduler instead of a closed loop")
+    p.add_argument("--deadline", type=float, default=None, help="override the scheduler's per-spawn deadline")
+    p.add_argument("--members", type=int, default=5000, help="members in each fake guild")
+    p.add_argument("--subscribers", type=int, default=500, help="members with ping subscriptions")
+    p.add_argument("--predictor", choices=[*PREDICTORS, "model"], default="recorded", help="serial has no predict_batch; url only has predict(url), like the autonamer today")
+    p.add_argument("--predict-ms", type=float, default=30.0, help="simulated model latency for the recorded predictor")
+    p.add_argument("--mongo-ms", type=float, default=2.0)
+    p.add_argument("--artwork-ms", type=float, default=0.0, help="simulated artwork CDN latency")
+    p.add_argument("--send-ms", type=float, default=50.0, help="simulated Discord upload latency")
+    p.add_argument("--cpu-executor", choices=["thread", "process"], default="thread")
+    p.add_argument("--cold", action="store_true", help="disable the prediction and card caches")
+    p.add_argument("--no-warmup", dest="warmup", action="store_false")
+    p.add_argument("--artwork-dir", default=None, help="serve artwork from here, placeholders otherwise")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--output", help="write the results as JSON")
+
+    s = sub.add_parser("synth", help="generate a synthetic events.jsonl with images")
+    s.add_argument("out")
+    s.add_argument("--count", type=int, default=100)
+    s.add_argument("--guilds", type=int, default=1)
+    s.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    for name in ("events", "out", "output", "artwork_dir"):
+        if getattr(args, name, None):
+            setattr(args, name, os.path.join(CWD, getattr(args, name)))
+    if args.command == "synth":
+        synth(args)
+    else:
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -33,9 +33,9 @@ class Ping_Pokemon(commands.Cog):
         self.type_collection = "type_ping"
         self.quest_collection = "quest_ping"
 
-        self.pokemon_names_file = r"data\bot\cogs\register\pokemon_names.csv"
-        self.pokemon_types_file = r"data\bot\cogs\register\pokemon_types.csv"
-        self.pokemon_rarity_file = r"bot\cogs\register\rarity.csv"
+        self.pokemon_names_file = r"data/bot/cogs/register/pokemon_names.csv"
+        self.pokemon_types_file = r"data/bot/cogs/register/pokemon_types.csv"
+        self.pokemon_rarity_file = r"bot/cogs/register/rarity.csv"
         self.pokemon_description_file = None
         self.embed_default_color = primary_color()
         self.RESULTS_PER_PAGE = 10
@@ -67,7 +67,8 @@ class Ping_Pokemon(commands.Cog):
             mongo_client=self.mongo,
             pokemon_names_csv=self.pokemon_names_file,
             pokemon_types_csv=self.pokemon_types_file,
-            pokemon_rarity_csv=self.pokemon_rarity_file
+            pokemon_rarity_csv=self.pokemon_rarity_file,
+            http_client=getattr(bot, "http_client", None)
         )
 
         self.embed_manager = PokemonEmbedManager(
@@ -184,11 +185,7 @@ class Ping_Pokemon(commands.Cog):
                 config.pop(key, None)
                 message = f"{ping_type.name} ping role has been removed."
 
-            await self.mongo.db["server_config"].update_one(
-                {"guild_id": guild_id},
-                {"$set": config},
-                upsert=True
-            )
+            await self.mongo.update_server_config(guild_id, {"$set": config})
 
             rare_role = interaction.guild.get_role(config.get("rare_role"))
             regional_role = interaction.guild.get_role(config.get("regional_role"))
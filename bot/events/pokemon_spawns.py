@@ -1,23 +1,17 @@
-import csv
-import json
-import re
-from pathlib import Path
+import asyncio
 import os
-import aiohttp
 import logging
-from fuzzywuzzy import fuzz
 
 
 # Local imports
 from lib.utils.cogs.register import *
 from lib.imports.discord import *
 from bot.cogs.register import Ping_Pokemon
-from lib.utils.events.poketwo_spawns import PokemonImageBuilder, PokemonUtils
+from lib.utils.events.poketwo_spawns import PokemonUtils, SpawnWorkerPool, SpawnCardCache, SubscriptionIndex, SubscriptionCache, PokemonAliasTable, PredictionBatcher, PredictionCache, ArtworkStore, PokemonImageBuilder, DominantColorTable, StageMetrics, SpawnRecorder, SpawnScheduler, SpawnInfoButton, SpecialNameMatcher, AltNameTable, SpawnPipeline
 from lib.utils.cogs.register import *
-from submodules.poketwo_autonamer.predict import Prediction
+from lib.config.spawns import spawn_config
 from bot.token import use_test_bot as ut
 from motor.motor_asyncio import AsyncIOMotorClient
-from lib.utils.events.poketwo_spawns import PokemonImageBuilder, PokemonUtils
 
 
 logger = logging.getLogger(__name__)
@@ -45,7 +39,13 @@ class PoketwoSpawnDetector(commands.Cog):
             r"shiny": r"<:shiny_sparkle:1394386258406412380>",
             r"collection": r"<:collection_ball:1394386212961124504>"
         }
-        self.predictor = Prediction()
+        self.workers = SpawnWorkerPool(**spawn_config["workers"])
+        self.batcher = PredictionBatcher(self.workers, **spawn_config["batching"])
+        self.prediction_cache = PredictionCache(**spawn_config["prediction_cache"]).load()
+        self.metrics = StageMetrics(**spawn_config["metrics"])
+        self.scheduler = SpawnScheduler(self.output_prediction, **spawn_config["scheduler"])
+        record_path = spawn_config["replay"]["record_path"]
+        self.recorder = SpawnRecorder(record_path, bot.http_client, self.workers) if record_path else None
         self.pp = Ping_Pokemon(bot)
 
         self.filepaths = {
@@ -54,13 +54,19 @@ class PoketwoSpawnDetector(commands.Cog):
             r"description": r"data/bot/cogs/register/descriptions.csv",
             r"id": r"data/bot/cogs/register/pokemon_names.csv",
             r"alt_names": r"data/bot/cogs/register/alt_names.csv",
-            r"flag_map": r"data\bot\cogs\register\flag.json",
+            r"flag_map": r"data/bot/cogs/register/flag.json",
             r"special_names": r"data/bot/cogs/register/special_names.csv",
-            r"image_output": r"data/events/poketwo_spawns/image/test.png"
+            r"image_config": r"data/bot/events/poketwo_spawns/image/config.json",
+            r"aliases": r"data/bot/cogs/register/pokemon_aliases.json",
+            r"colors": r"data/bot/cogs/register/dominant_colors.csv"
         }
 
 
         self.mongo = MongoHelper(AsyncIOMotorClient(os.getenv("MONGO_URI"))["Commands"]["pokemon"])
+        self.aliases = PokemonAliasTable(self.filepaths["id"], self.filepaths["aliases"]).load()
+        self.subscription_index = SubscriptionIndex(aliases=self.aliases)
+        self.subscriptions = SubscriptionCache(self.mongo, self.subscription_index, **spawn_config["subscriptions"])
+        MongoHelper.listeners.extend((self.subscription_index.on_write, self.subscriptions.on_write))
         self.pokemon_utils = PokemonUtils(
             self.mongo,
             type_emojis_file=self.filepaths["type_emojis"],
@@ -70,159 +76,240 @@ class PoketwoSpawnDetector(commands.Cog):
             regional_forms=self.regional_forms,
             lang_flags=self.lang_flags,
             bot=self.bot,
-            pp=self.pp
+            pp=self.pp,
+            lookup_timeout=spawn_config["lookups"]["timeout"],
+            subscriptions=self.subscriptions,
+            aliases=self.aliases,
+            color_table=DominantColorTable(self.filepaths["colors"])
         )
-        self.pokemon_image_builder = PokemonImageBuilder()
-        self.alt_names_map = self.load_alt_names(self.filepaths["alt_names"])
-        self.flag_map = self.load_flag_map(self.filepaths["flag_map"])
-
-    def load_alt_names(self, filepath):
-        alt_map = {}
-        if not Path(filepath).exists():
-            return alt_map
-        with open(filepath, newline="", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                slug = row["pokemon_species"].strip().lower()
-                alt_map[slug] = {lang: name.strip() for lang, name in row.items() if lang != "pokemon_species" and name.strip()}
-        return alt_map
-
-    def load_flag_map(self, filepath):
-        if not Path(filepath).exists():
-            return {}
-        with open(filepath, encoding="utf-8") as f:
-            return json.load(f)
-
-    def get_best_normal_alt_name(self, slug):
-        if slug not in self.alt_names_map:
-            return None
-        slug_lower = slug.lower()
-        items = []
-        for lang, name in self.alt_names_map[slug].items():
-            if not re.fullmatch(r"[A-Za-z0-9\- ']+", name) or name.lower() == slug_lower:
-                continue
-            flag = self.flag_map.get(lang, '')
-            if not flag:
-                print(f"[WARN] No flag for language: {lang}")
-            items.append((flag, name))
-        if not items:
-            return None
-        flag, name = min(items, key=lambda x: (len(x[1]), 0 if x[0] else 1))
-        return f"{flag} {name}" if flag else name
-
-    async def load_special_names(self):
-        rare, regional = [], []
+        self.special_names = SpecialNameMatcher(
+            self.filepaths["special_names"], self.regional_forms.values(), self.pokemon_utils.load_pokemon_ids(), **spawn_config["special_names"]
+        ).load()
+        self.artwork = ArtworkStore(base_url=PokemonImageBuilder.ARTWORK_URL, **spawn_config["artwork"])
+        self.card_cache = SpawnCardCache(self.filepaths["image_config"], self.workers, **spawn_config["card_cache"])
+        self.alt_names = AltNameTable(self.filepaths["alt_names"], self.filepaths["flag_map"]).load()
+        self.info_templates = {}
+        self.card_args = self.load_card_args()
+
+    async def cog_load(self):
+        self.subscriptions.start()
+        self.scheduler.start()
+        self.bot.add_dynamic_items(SpawnInfoButton)
+        if hasattr(self.bot, "metrics"):
+            self.bot.metrics["spawns"] = self.metrics
+            self.bot.metrics["spawn_queue"] = self.scheduler
+
+    async def cog_unload(self):
+        self.prediction_cache.save()
+        self.workers.shutdown()
+        self.subscriptions.stop()
+        self.scheduler.stop()
+        self.bot.remove_dynamic_items(SpawnInfoButton)
+        metrics = getattr(self.bot, "metrics", {})
+        if metrics.get("spawns") is self.metrics:
+            del metrics["spawns"]
+        if metrics.get("spawn_queue") is self.scheduler:
+            del metrics["spawn_queue"]
+        for listener in (self.subscription_index.on_write, self.subscriptions.on_write):
+            if listener in MongoHelper.listeners:
+                MongoHelper.listeners.remove(listener)
+
+    async def predict(self, image_url):
+        # The image is downloaded once: the same bytes are hashed for the cache and handed to the model
+        image_bytes = None
         try:
-            with open(self.filepaths["special_names"], 'r', newline='', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                next(reader)
-                for row in reader:
-                    if len(row) >= 1 and row[0]:
-                        rare.append(row[0].strip().lower())
-                    if len(row) >= 2 and row[1]:
-                        regional.append(row[1].strip().lower())
-        except FileNotFoundError:
-            pass
-        return rare, regional
-
-    async def output_prediction(self, message, image_url):
+            with self.metrics.stage("download"):
+                image_bytes = await self.bot.http_client.read(image_url)
+            with self.metrics.stage("hash"):
+                key = await self.workers.run_io(self.prediction_cache.key, image_bytes)
+        except Exception as e:
+            logger.warning(f"Spawn image hashing failed, predicting uncached: {e}")
+            with self.metrics.stage("predict"):
+                return await self.batcher.predict(image_url, image_bytes)
+        if cached := self.prediction_cache.get(key):
+            return cached
+        with self.metrics.stage("predict"):
+            result = await self.batcher.predict(image_url, image_bytes)
+        if self.prediction_cache.put(key, result):
+            await self.workers.run_io(self.prediction_cache.save)
+        return result
+
+    async def output_prediction(self, message, image_url, degraded=False):
         try:
-            slug, conf = self.predictor.predict(image_url)
+            with self.metrics.stage("total"):
+                await self.process_spawn(message, image_url, degraded)
+        except Exception as e:
+            logger.error(f"Error in output_prediction: {type(e).__name__}: {e}")
+            await message.channel.send(f"{self.error_emoji} Failed to process spawn", reference=message)
+
+    async def process_spawn(self, message, image_url, degraded=False):
+        stage = self.metrics.stage
+        deadline = spawn_config["lookups"]["deadline"]
+
+        async def server_config():
+            with stage("server_config"):
+                return await self.pokemon_utils.get_server_config(message.guild.id)
+
+        async def prediction():
+            slug, conf = await self.predict(image_url)
+            if self.recorder:
+                self.recorder.record(message, image_url, slug, conf)
+            return slug, conf
+
+        async def pings(prediction):
+            slug = prediction[0]
+            with stage("lookups"):
+                return await self.pokemon_utils.fan_out({
+                    "pings": (self.pokemon_utils.get_ping_users(message.guild, slug), ([], [])),
+                    "type_pings": (self.pokemon_utils.get_type_ping_users(message.guild, slug), {}),
+                    "quest_pings": (self.pokemon_utils.get_quest_ping_users(message.guild, slug), []),
+                }, deadline=deadline)
+
+        async def card_args(prediction):
+            slug_lower = prediction[0].lower()
+            if (args := self.card_args.get(slug_lower)) is None:
+                args = self.card_args[slug_lower] = self.make_card_args(slug_lower)
+            key = self.card_cache.make_key(**args)
+            return args, key, await self.card_cache.get(key)
+
+        async def artwork(card_args):
+            # Fetch on the I/O pool so a render never holds a CPU worker while waiting on the network
+            args, _, card = card_args
+            if card is None and not degraded and args["pokemon_id"]:
+                try:
+                    with stage("artwork"):
+                        await self.workers.run_io(self.artwork.prefetch, args["pokemon_id"])
+                except Exception as e:
+                    logger.warning(f"Artwork prefetch for {args['pokemon_id']} failed: {e}")
+
+        async def card(card_args, _):
+            args, key, card = card_args
+            if card is None and not degraded:
+                with stage("render"):
+                    card = await self.workers.create_image(**args, in_memory=True)
+                if getattr(card, "config_hash", None) == key[-1]:
+                    self.card_cache.put(key, card)
+            return card
+
+        async def ping_message(prediction, server_config, lookups):
+            slug, conf = prediction
             pred_text = f"{float(conf):.2f}%" if isinstance(conf, (int, float)) else str(conf)
-            rare, regional = await self.load_special_names()
-            server_config = await self.pokemon_utils.get_server_config(message.guild.id)
-            slug_lower = slug.lower()
+            with stage("special_names"):
+                rare, regional = self.special_names.classify(slug)
             special_roles = []
-            if any(p in slug_lower for p in rare) and server_config.get("rare_role"):
+            if rare and server_config.get("rare_role"):
                 special_roles.append(f"<@&{server_config['rare_role']}>")
-            if (any(p in slug_lower for p in regional) or any(slug_lower.startswith(f"{form}-") for form in self.regional_forms.values())) and server_config.get("regional_role"):
+            if regional and server_config.get("regional_role"):
                 special_roles.append(f"<@&{server_config['regional_role']}>")
+            shiny_pings, collection_pings = lookups["pings"]
+            with stage("format"):
+                return self.format_ping_message(
+                    slug, lookups["type_pings"], lookups["quest_pings"], shiny_pings, collection_pings, " ".join(special_roles), pred_text
+                )
 
-            shiny_pings, collection_pings = await self.pokemon_utils.get_ping_users(message.guild, slug)
-            type_pings = await self.pokemon_utils.get_type_ping_users(message.guild, slug)
-            quest_pings = await self.pokemon_utils.get_quest_ping_users(message.guild, slug)
-            description, dex_number, row = self.pokemon_utils.get_description(slug)
-            if not dex_number or dex_number == "???":
-                dex_number = self.pokemon_utils.load_pokemon_ids().get(slug_lower, "???")
-
-            ping_msg, embed = await self.format_messages(
-                slug, type_pings, quest_pings, shiny_pings, collection_pings,
-                " ".join(special_roles), pred_text, dex_number, description, image_url
-            )
-
-            best_alt = self.get_best_normal_alt_name(slug_lower)
-            self.pokemon_image_builder.create_image(
-                pokemon_id=int(self.pokemon_utils.load_pokemon_ids().get(slug_lower, 0)),
-                pokemon_name=self.pokemon_utils.format_name(slug),
-                best_name=best_alt or "",
-                types=self.pokemon_utils.get_pokemon_types(slug),
-                bg_url=None
-            )
-            file = discord.File(self.filepaths["image_output"], filename="pokemon_spawn.png")
-            info_button = discord.ui.Button(label="Info", style=discord.ButtonStyle.primary)
-
-            async def info_callback(interaction):
-                await interaction.response.send_message(embed=embed, ephemeral=True)
-
-            info_button.callback = info_callback
+        async def send(prediction, ping_msg, card):
             view = discord.ui.View(timeout=None)
-            view.add_item(info_button)
-            await message.channel.send(content=ping_msg, file=file, view=view, reference=message)
+            view.add_item(SpawnInfoButton(*prediction))
+            with stage("send"):
+                if card is None:
+                    await message.channel.send(content=ping_msg, view=view, reference=message)
+                else:
+                    await message.channel.send(content=ping_msg, file=discord.File(card, filename=card.name), view=view, reference=message)
+
+        # server config only needs the guild; pings and the card start as soon as the slug is known
+        pipeline = SpawnPipeline()
+        try:
+            pipeline.add("server_config", server_config).add("prediction", prediction)
+            pipeline.add("pings", pings, "prediction").add("card_args", card_args, "prediction")
+            pipeline.add("artwork", artwork, "card_args").add("card", card, "card_args", "artwork")
+            pipeline.add("ping_message", ping_message, "prediction", "server_config", "pings")
+            pipeline.add("send", send, "prediction", "ping_message", "card")
+            await pipeline.result("send")
+        finally:
+            pipeline.close()
+
+    def load_card_args(self):
+        # The card only depends on the species, so its inputs are resolved for every known slug up front
+        ids, rows = self.pokemon_utils.pokemon_ids, self.pokemon_utils.rows
+        return {slug: self.make_card_args(slug, ids.get(slug), rows.get(slug)) for slug in (ids.keys() | rows.keys()) - {""}}
+
+    def make_card_args(self, slug, pokemon_id=None, row=None):
+        return dict(
+            pokemon_id=int(pokemon_id) if str(pokemon_id).isdigit() else 0,
+            pokemon_name=self.pokemon_utils.format_name(slug),
+            best_name=self.alt_names.best.get(slug) or "",
+            types=PokemonUtils.row_types(row),
+            bg_url=None
+        )
 
-        except Exception as e:
-            logger.error(f"Error in output_prediction: {type(e).__name__}: {e}")
-            await message.channel.send(f"{self.error_emoji} Failed to process spawn", reference=message)
+    def format_ping_message(self, slug, type_pings, quest_pings, shiny_pings, collection_pings, special_roles, pred_text):
+        lines = []
+        if special_roles:
+            lines.append(special_roles)
 
-    async def format_messages(self, slug, type_pings, quest_pings, shiny_pings, collection_pings,
-                              special_roles, pred_text, dex_number, description, image_url):
-        try:
-            lines = []
-            if special_roles:
-                lines.append(special_roles)
-
-            formatted_name = self.pokemon_utils.format_name(slug)
-            lines.append(f"**{formatted_name}**: {pred_text}")
-
-            ping_parts = []
-            if shiny_pings:
-                ping_parts.append(f"Shiny: {' '.join(shiny_pings)}")
-            if collection_pings:
-                ping_parts.append(f"Collectors: {' '.join(collection_pings)}")
-            if quest_pings:
-                ping_parts.append(f"Regional: {' '.join(quest_pings)}")
-
-            type_parts = [f"{label}: {users}" for label, users in type_pings.items() if users]
-            if type_parts:
-                ping_parts.append("Types: " + " | ".join(type_parts))
-
-            if ping_parts:
-                lines.append("\n".join(ping_parts))
-
-            alt_names = self.alt_names_map.get(slug.lower(), {})
-            emoji_types = [f"{self.pokemon_utils._type_emojis.get(f'{t.lower()}_type','')} {t.title()}" for t in self.pokemon_utils.get_pokemon_types(slug) if t]
-            region = self.pokemon_utils.get_pokemon_region(slug)
-
-            thumb_url = (
-                f"https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/other/official-artwork/{dex_number}.png"
-                if slug and slug.lower() not in ("", "???") else image_url
-            )
-
-            color = await self.pokemon_utils.get_image_color(thumb_url)
-            embed = discord.Embed(color=color, description=description or None)
-            if alt_names:
-                embed.add_field(name="Alt Names", value="\n".join(list(alt_names.values())[:10]), inline=True)
-            if emoji_types:
-                embed.add_field(name="Types", value="\n".join(emoji_types), inline=True)
-            if region:
-                embed.add_field(name="Region", value=region, inline=True)
-            embed.set_thumbnail(url=thumb_url)
+        formatted_name = self.pokemon_utils.format_name(slug)
+        lines.append(f"**{formatted_name}**: {pred_text}")
+
+        ping_parts = []
+        if shiny_pings:
+            ping_parts.append(f"Shiny: {' '.join(shiny_pings)}")
+        if collection_pings:
+            ping_parts.append(f"Collectors: {' '.join(collection_pings)}")
+        if quest_pings:
+            ping_parts.append(f"Regional: {' '.join(quest_pings)}")
+
+        type_parts = [f"{label}: {users}" for label, users in type_pings.items() if users]
+        if type_parts:
+            ping_parts.append("Types: " + " | ".join(type_parts))
 
-            return "\n".join(lines), embed
+        if ping_parts:
+            lines.append("\n".join(ping_parts))
+        return "\n".join(lines)
+
+    async def build_info_embed(self, slug, confidence="", fallback_thumb=None):
+        try:
+            key = slug.lower()
+            if (template := self.info_templates.get(key)) is None:
+                template, memoize = await self.build_info_template(slug, fallback_thumb)
+                if memoize:
+                    self.info_templates[key] = template
+            embed = template.copy()
+            if confidence:
+                embed.set_footer(text=f"Prediction confidence: {confidence}%")
+            return embed
 
         except Exception as e:
-            logger.error(f"Error in format_messages: {type(e).__name__}: {e}")
-            fallback = f"**{slug}**\nFailed to format spawn info."
-            return fallback, discord.Embed(color=0xFF0000, description="An error occurred generating this embed.")
+            logger.error(f"Error in build_info_embed: {type(e).__name__}: {e}")
+            return discord.Embed(color=0xFF0000, description="An error occurred generating this embed.")
+
+    async def build_info_template(self, slug, fallback_thumb=None):
+        # Only known species with a resolved colour are memoized; unknown slugs depend on the spawn image
+        description, dex_number, row = self.pokemon_utils.get_description(slug)
+        if not dex_number or dex_number == "???":
+            dex_number = self.pokemon_utils.load_pokemon_ids().get(slug.lower(), "???")
+        alt_names = self.alt_names.names.get(slug.lower(), ())
+        emoji_types = [f"{self.pokemon_utils._type_emojis.get(f'{t.lower()}_type','')} {t.title()}" for t in self.pokemon_utils.get_pokemon_types(slug) if t]
+        region = self.pokemon_utils.get_pokemon_region(slug)
+
+        known = bool(slug) and slug.lower() != "???" and str(dex_number).isdigit()
+        if known:
+            thumb_url = f"{PokemonImageBuilder.ARTWORK_URL}{dex_number}.png"
+            with self.metrics.stage("color"):
+                color = await self.pokemon_utils.get_dex_color(dex_number, thumb_url, fallback=None)
+        else:
+            thumb_url = fallback_thumb
+            with self.metrics.stage("color"):
+                color = await self.pokemon_utils.get_image_color(thumb_url, fallback=None) if thumb_url else None
+        embed = discord.Embed(color=0x3498db if color is None else color, description=description or None)
+        if alt_names:
+            embed.add_field(name="Alt Names", value="\n".join(alt_names[:10]), inline=True)
+        if emoji_types:
+            embed.add_field(name="Types", value="\n".join(emoji_types), inline=True)
+        if region:
+            embed.add_field(name="Region", value=region, inline=True)
+        if thumb_url:
+            embed.set_thumbnail(url=thumb_url)
+        return embed, known and color is not None
 
     @commands.Cog.listener()
     async def on_message(self, message):
@@ -230,7 +317,7 @@ class PoketwoSpawnDetector(commands.Cog):
             if not ut and message.author.id == self.target_id:
                 for e in message.embeds:
                     if e.title and "pokémon has appeared!" in e.title.lower() and e.image:
-                        await self.output_prediction(message, e.image.url)
+                        self.scheduler.submit(message, e.image.url)
         except Exception as e:
             print(f"{self.cross_emoji} Error in on_message: {type(e).__name__}: {e}")
 
@@ -251,6 +338,66 @@ class PoketwoSpawnDetector(commands.Cog):
         except Exception as e:
             await ctx.send(f"{self.cross_emoji} Prediction error: {type(e).__name__}: {e}")
 
+    @commands.command(name="batch_stats", hidden=True)
+    @commands.is_owner()
+    async def batch_stats(self, ctx):
+        lines = []
+        for name, summary in self.batcher.stats().items():
+            lines.append(f"{name:<11} n={summary['count']:<6} mean={summary['mean']:.3f} p50={summary['p50']:.3f} p90={summary['p90']:.3f} p99={summary['p99']:.3f} max={summary['max']:.3f}")
+        cache = self.prediction_cache.stats()
+        lines.append(f"{'cache':<11} entries={cache['entries']} hits={cache['hits']} misses={cache['misses']} hit_rate={cache['hit_rate']:.1%}")
+        await ctx.send("```\n" + "\n".join(lines) + "\n```")
+
+    @commands.command(name="spawn_stats", hidden=True)
+    @commands.is_owner()
+    async def spawn_stats(self, ctx, reset: bool = False):
+        if not self.metrics.enabled:
+            return await ctx.send(f"{self.cross_emoji} Spawn metrics are disabled in `spawn_config['metrics']`.")
+        summary = self.metrics.summary()
+        if not summary:
+            return await ctx.send("No spawns timed yet.")
+        lines = [f"{'stage':<14}{'n':>7}{'mean':>9}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}{'failed':>8}{'cancel':>8}"]
+        for name, s in sorted(summary.items(), key=lambda kv: -kv[1]["mean"]):
+            lines.append(f"{name:<14}{s['count']:>7}{s['mean']:>9.3f}{s['p50']:>9.3f}{s['p90']:>9.3f}{s['p99']:>9.3f}{s['max']:>9.3f}{s['failed']:>8}{s['cancelled']:>8}")
+        queue = self.scheduler.summary()
+        lines.append("")
+        lines.append(f"queue depth={queue['queue_depth']} active={queue['active']} wait_p90={queue['queue_wait']['p90']:.3f}")
+        lines.append(" ".join(f"{k}={queue[k]}" for k in ("submitted", "completed", "degraded", "shed_full", "shed_expired", "timed_out", "failed")))
+        if reset:
+            self.metrics.reset()
+            self.scheduler.reset()
+        await ctx.send("```\n" + "\n".join(lines) + "\n```")
+
+    @commands.command(name="record_spawns", hidden=True)
+    @commands.is_owner()
+    async def record_spawns(self, ctx, path=None):
+        if not path:
+            state = f"recording to `{self.recorder.path}` ({self.recorder.recorded} spawns)" if self.recorder else "not recording"
+            return await ctx.send(f"Spawn replay: {state}.")
+        if path.lower() == "off":
+            self.recorder = None
+            return await ctx.send(f"{self.success_emoji} Stopped recording spawns.")
+        self.recorder = SpawnRecorder(path, self.bot.http_client, self.workers)
+        await ctx.send(f"{self.success_emoji} Recording spawns to `{path}`.")
+
+    @commands.command(name="build_colors", hidden=True)
+    @commands.is_owner()
+    async def build_colors(self, ctx):
+        store = ArtworkStore(base_url=PokemonImageBuilder.ARTWORK_URL, **spawn_config["artwork"])
+        dex_numbers = self.pokemon_utils.load_dex_numbers()
+        msg = await ctx.send(f"Computing embed colours for {len(dex_numbers)} dex numbers...")
+        built = await asyncio.get_running_loop().run_in_executor(None, self.pokemon_utils.color_table.build, dex_numbers, store)
+        await msg.edit(content=f"{self.success_emoji} Stored {built}/{len(dex_numbers)} colours in `{self.filepaths['colors']}`.")
+
+    @commands.command(name="seed_artwork", hidden=True)
+    @commands.is_owner()
+    async def seed_artwork(self, ctx):
+        store = ArtworkStore(base_url=PokemonImageBuilder.ARTWORK_URL, **spawn_config["artwork"])
+        ids = sorted({int(pid) for pid in self.pokemon_utils.load_pokemon_ids().values() if str(pid).isdigit()})
+        msg = await ctx.send(f"Seeding artwork for {len(ids)} Pokémon...")
+        seeded, missing = await asyncio.get_running_loop().run_in_executor(None, store.seed, ids)
+        await msg.edit(content=f"{self.success_emoji} Seeded {seeded}/{missing} missing artwork images ({len(ids) - missing} already stored).")
+
 
 def setup(bot):
     bot.add_cog(PoketwoSpawnDetector(bot))
@@ -0,0 +1,108 @@
+# Draws the bundled regional-indicator flag PNGs; run with python data/bot/assets/emoji/flags.py
+import math, os
+from PIL import Image, ImageDraw
+S = 4; W, H = 72 * S, 72 * S
+TOP, BOT = 10 * S, 62 * S
+FW, FH = W, BOT - TOP
+OUT = os.path.dirname(os.path.abspath(__file__))
+
+def name(cc):
+    return "-".join(f"{0x1f1e6 + ord(c) - ord('A'):x}" for c in cc.upper()) + ".png"
+
+def star(d, cx, cy, r, fill, rot=-90):
+    pts = []
+    for i in range(10):
+        rr = r if i % 2 == 0 else r * 0.382
+        a = math.radians(rot + i * 36)
+        pts.append((cx + rr * math.cos(a), cy + rr * math.sin(a)))
+    d.polygon(pts, fill=fill)
+
+def hbands(d, colors, weights=None):
+    weights = weights or [1] * len(colors)
+    y = 0
+    for c, w in zip(colors, weights):
+        h = FH * w / sum(weights)
+        d.rectangle((0, y, FW, y + h), fill=c); y += h
+
+def vbands(d, colors):
+    for i, c in enumerate(colors):
+        d.rectangle((FW * i / len(colors), 0, FW * (i + 1) / len(colors), FH), fill=c)
+
+def jp(d):
+    d.rectangle((0, 0, FW, FH), fill="#EEEEEE")
+    r = FH * 0.3; d.ellipse((FW / 2 - r, FH / 2 - r, FW / 2 + r, FH / 2 + r), fill="#ED1B2F")
+
+def kr(d):
+    d.rectangle((0, 0, FW, FH), fill="#EEEEEE")
+    cx, cy, r = FW / 2, FH / 2, FH * 0.25
+    d.pieslice((cx - r, cy - r, cx + r, cy + r), 180 + 34, 34, fill="#C60C30")
+    d.pieslice((cx - r, cy - r, cx + r, cy + r), 34, 180 + 34, fill="#003478")
+    a = math.radians(34); dx, dy = math.cos(a) * r / 2, math.sin(a) * r / 2
+    d.ellipse((cx - dx - r / 2, cy - dy - r / 2, cx - dx + r / 2, cy - dy + r / 2), fill="#C60C30")
+    d.ellipse((cx + dx - r / 2, cy + dy - r / 2, cx + dx + r / 2, cy + dy + r / 2), fill="#003478")
+    for sx, sy in ((-1, -1), (1, -1), (-1, 1), (1, 1)):
+        ox, oy = cx + sx * FW * 0.33, cy + sy * FH * 0.3
+        ang = math.atan2(sy, sx) + math.pi / 2
+        for k in (-1, 0, 1):
+            px, py = ox + math.cos(ang + math.pi / 2) * k * 4.5 * S, oy + math.sin(ang + math.pi / 2) * k * 4.5 * S
+            hx, hy = math.cos(ang) * 8 * S, math.sin(ang) * 8 * S
+            d.line((px - hx, py - hy, px + hx, py + hy), fill="#111111", width=3 * S)
+
+def tw(d):
+    d.rectangle((0, 0, FW, FH), fill="#FE0000")
+    d.rectangle((0, 0, FW / 2, FH / 2), fill="#000095")
+    cx, cy = FW / 4, FH / 4
+    for i in range(12):
+        a = math.radians(i * 30)
+        d.polygon([(cx + math.cos(a) * 10 * S, cy + math.sin(a) * 10 * S),
+                   (cx + math.cos(a + 0.35) * 5 * S, cy + math.sin(a + 0.35) * 5 * S),
+                   (cx + math.cos(a - 0.35) * 5 * S, cy + math.sin(a - 0.35) * 5 * S)], fill="white")
+    d.ellipse((cx - 5.5 * S, cy - 5.5 * S, cx + 5.5 * S, cy + 5.5 * S), fill="#000095")
+    d.ellipse((cx - 4.5 * S, cy - 4.5 * S, cx + 4.5 * S, cy + 4.5 * S), fill="white")
+
+def cn(d):
+    d.rectangle((0, 0, FW, FH), fill="#DE2910")
+    u = FH / 20
+    star(d, 5 * u, 5 * u, 3 * u, "#FFDE00")
+    for x, y in ((10, 2), (12, 4), (12, 7), (10, 9)):
+        star(d, x * u, y * u, 1 * u, "#FFDE00", rot=math.degrees(math.atan2(5 - y, 5 - x)))
+
+def us(d):
+    hbands(d, ["#B22334" if i % 2 == 0 else "#EEEEEE" for i in range(13)])
+    cw, ch = FW * 0.45, FH * 7 / 13
+    d.rectangle((0, 0, cw, ch), fill="#3C3B6E")
+    for row in range(5):
+        for col in range(6 - row % 2):
+            x = cw * (col + 0.5 + (row % 2) * 0.5) / 6; y = ch * (row + 0.5) / 5
+            star(d, x, y, 2.2 * S, "white")
+
+def br(d):
+    d.rectangle((0, 0, FW, FH), fill="#009B3A")
+    m = 6 * S
+    d.polygon([(FW / 2, m), (FW - m, FH / 2), (FW / 2, FH - m), (m, FH / 2)], fill="#FEDF00")
+    r = FH * 0.24
+    d.ellipse((FW / 2 - r, FH / 2 - r, FW / 2 + r, FH / 2 + r), fill="#002776")
+    d.arc((FW / 2 - r * 1.6, FH / 2 - r * 0.55, FW / 2 + r * 1.1, FH / 2 + r * 2.6), 208, 300, fill="white", width=2 * S)
+
+def cz(d):
+    hbands(d, ["#EEEEEE", "#D7141A"])
+    d.polygon([(0, 0), (FW / 2, FH / 2), (0, FH)], fill="#11457E")
+
+FLAGS = {
+    "jp": jp, "kr": kr, "tw": tw, "cn": cn, "us": us, "br": br, "cz": cz,
+    "fr": lambda d: vbands(d, ["#002395", "#EEEEEE", "#ED2939"]),
+    "it": lambda d: vbands(d, ["#009246", "#EEEEEE", "#CE2B37"]),
+    "de": lambda d: hbands(d, ["#141414", "#DD0000", "#FFCE00"]),
+    "es": lambda d: hbands(d, ["#C60B1E", "#FFC400", "#C60B1E"], [1, 2, 1]),
+}
+
+os.makedirs(OUT, exist_ok=True)
+for cc, draw in FLAGS.items():
+    flag = Image.new("RGBA", (FW, FH), (0, 0, 0, 0))
+    draw(ImageDraw.Draw(flag))
+    mask = Image.new("L", (FW, FH), 0)
+    ImageDraw.Draw(mask).rounded_rectangle((0, 0, FW - 1, FH - 1), radius=8 * S, fill=255)
+    canvas = Image.new("RGBA", (W, H), (0, 0, 0, 0))
+    canvas.paste(flag, (0, TOP), mask)
+    canvas.resize((72, 72), Image.LANCZOS).save(os.path.join(OUT, name(cc)), optimize=True)
+    print(cc, name(cc))
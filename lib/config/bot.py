@@ -14,4 +14,14 @@ bot_config = {
         "token_key": "Bloom_Token"
         
     }   # Main Bot Configuration
-}
\ No newline at end of file
+}
+
+
+http_config = {
+    "limit": 100,              # open connections across all hosts
+    "limit_per_host": 20,
+    "dns_ttl": 300,            # seconds resolved addresses are reused
+    "keepalive_timeout": 30,
+    "total_timeout": 15,
+    "connect_timeout": 5
+}
@@ -2,7 +2,7 @@
 from PIL import Image
 from lib.imports.discord import *
  
-def primary_color(image_path="data/bot\images/bot.png"):
+def primary_color(image_path="data/bot/images/bot.png"):
     image = Image.open(image_path)
     image = image.convert("RGB")
     resized_image = image.resize((1, 1))
@@ -0,0 +1,61 @@
+spawn_config = {
+    "workers": {
+        "cpu_executor": "process",  # "process" runs inference/rendering in child processes, "thread" keeps them in-process
+        "cpu_workers": 2,
+        "io_workers": 8,
+        "max_queue": 32,            # jobs waiting or running before new spawns are rejected
+        "job_timeout": 20,          # seconds a single prediction or render may take
+        "start_timeout": 120,       # seconds a new CPU worker may spend loading the model before it is replaced
+        "start_method": "forkserver",  # "forkserver" or "spawn"; never fork a parent that already runs threads
+    },
+    "batching": {
+        "max_batch": 8,             # spawn images sent to the predictor together
+        "max_wait": 0.01,           # seconds the first image waits for others to join its batch
+    },
+    "prediction_cache": {
+        "max_entries": 4096,
+        "mode": "sha256",           # "sha256" for identical images, "dhash" to also match near-duplicates
+        "max_distance": 4,          # dhash bits that may differ for a near-duplicate hit
+        "snapshot_path": "data/events/poketwo_spawns/prediction_cache.json",  # set to None to skip the warm-start snapshot
+        "snapshot_every": 50,       # new entries between snapshot writes
+    },
+    "scheduler": {
+        "workers": 4,               # spawns processed concurrently
+        "max_queue": 64,            # queued spawns before the oldest is shed
+        "deadline": 20.0,           # seconds after a spawn arrives that a reply is still worth sending
+        "degrade_after": 8.0,       # seconds queued after which an uncached card render is skipped
+    },
+    "lookups": {
+        "timeout": 2.0,             # seconds any single Mongo lookup may take before its ping section is skipped
+        "deadline": 3.0,            # seconds all per-spawn lookups share
+    },
+    "special_names": {
+        "reload_interval": 30,      # seconds between checks of special_names.csv for edits
+    },
+    "subscriptions": {
+        "poll_interval": 30,        # seconds between delta polls (documents by updated_at) when Mongo change streams are unavailable
+        "reconcile_interval": 900,  # seconds between full re-reads in polling mode, for deletes and unstamped edits made elsewhere
+    },
+    "artwork": {
+        "cache_dir": "data/events/poketwo_spawns/artwork",
+        "max_disk_bytes": 256 * 1024 * 1024,
+        "max_memory": 256,          # decoded RGBA sprites kept per process
+        "source_dir": None,         # read artwork from this directory instead of PokeAPI (offline fixtures)
+        "timeout": 10,
+    },
+    "card_cache": {
+        "max_entries": 512,         # rendered cards kept in memory
+        "disk_dir": "data/events/poketwo_spawns/cards",  # set to None to keep the cache memory-only
+    },
+    "emoji": {
+        "atlas_dir": "data/events/poketwo_spawns/emoji",  # rendered glyphs, named like twemoji files (1f1ef-1f1f5.png)
+        "asset_dir": "data/bot/assets/emoji",  # bundled PNGs that take priority over the emoji font
+        "glyph_size": 109,          # size glyphs are rendered at before scaling to the text font
+    },
+    "metrics": {
+        "enabled": True,            # per-stage spawn latency histograms, served at /metrics and by the spawn_stats command
+    },
+    "replay": {
+        "record_path": None,        # append live spawns to this JSONL for benchmarks/spawn_replay.py (images go to images/ beside it)
+    },
+}
@@ -7,15 +7,17 @@ import cv2
 
 
 class AvatarToTextArt:
-    def __init__(s, url, w=80, h=40):
+    def __init__(s, url, w=80, h=40, data=None):
         s.u = url
+        s.d = data
         s.w = w
         s.h = h
         s.i = s.g = s.r = s.a = s.ca = None
         s.c = '@%#*+=-:. '
 
     def f(s):
-        s.i = np.array(Image.open(io.BytesIO(requests.get(s.u).content)).convert('RGB'))
+        if s.d is None: s.d = requests.get(str(s.u), timeout=10).content
+        s.i = np.array(Image.open(io.BytesIO(s.d)).convert('RGB'))
 
     def g_(s):
         if s.i is not None: s.g = cv2.cvtColor(s.i, cv2.COLOR_RGB2GRAY)
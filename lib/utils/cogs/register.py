@@ -8,6 +8,7 @@ import logging
 import aiohttp
 import difflib
 import traceback
+from datetime import datetime, timezone
 from PIL import Image
 import multiprocessing as mp
 from pathlib import Path
@@ -24,14 +25,16 @@ from tqdm import tqdm
 from lib.imports.logger import *
 from lib.utils.cogs.register import *
 from lib.imports.discord import *
+from lib.utils.http import shared_session
 
 
 MAX_POKEMON, CHUNK_SIZE, RESULTS_PER_PAGE, MIN_SIMILARITY_RATIO  = 50, 15, 10, 0.65
 
 
 class PokemonDataManager:
-    def __init__(self, mongo_client, pokemon_names_csv, pokemon_types_csv, pokemon_rarity_csv):
+    def __init__(self, mongo_client, pokemon_names_csv, pokemon_types_csv, pokemon_rarity_csv, http_client=None):
         self.mongo = mongo_client
+        self.http_client = http_client
         self.pokemon_names_csv = pokemon_names_csv
         self.pokemon_types_csv = pokemon_types_csv
         self.pokemon_rarity_csv = pokemon_rarity_csv
@@ -85,7 +88,7 @@ class PokemonDataManager:
         url = self.pokemon_species_url
         total_pages = 0
         
-        async with aiohttp.ClientSession() as session:
+        async with shared_session(self.http_client) as session:
             async with session.get(url) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -95,7 +98,7 @@ class PokemonDataManager:
 
         url = self.pokemon_species_url
         with tqdm(total=total_pages, desc="Fetching Pokemon species") as pbar:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session(self.http_client) as session:
                 while url:
                     async with session.get(url) as response:
                         if response.status == 200:
@@ -109,7 +112,7 @@ class PokemonDataManager:
 
     async def fetch_pokemon_details(self, pokemon_list):
         detailed_pokemon = []
-        async with aiohttp.ClientSession() as session:
+        async with shared_session(self.http_client) as session:
             for pokemon in tqdm(pokemon_list, desc="Fetching Pokemon details"):
                 try:
                     pokemon_id = int(pokemon["url"].rstrip("/").split("/")[-1])
@@ -127,7 +130,7 @@ class PokemonDataManager:
 
     async def fetch_pokemon_rarity_data(self):
         rarity_data = []
-        async with aiohttp.ClientSession() as session:
+        async with shared_session(self.http_client) as session:
             try:
                 async with session.get("https://pokeapi.co/api/v2/pokemon-species?limit=2000") as response:
                     if response.status == 200:
@@ -1201,11 +1204,7 @@ class RoleSelect(discord.ui.Select):
 
     async def callback(self, interaction: discord.Interaction):
         if not self.values:
-            await self.mongo.db["server_config"].update_one(
-                {"guild_id": self.guild_id},
-                {"$unset": {f"{self.role_type}_role": ""}},
-                upsert=True
-            )
+            await self.mongo.update_server_config(self.guild_id, {"$unset": {f"{self.role_type}_role": ""}})
             return await interaction.response.send_message(
                 f"❎ Cleared {self.role_type.title()} Pokémon role.", ephemeral=True
             )
@@ -1213,11 +1212,7 @@ class RoleSelect(discord.ui.Select):
         role_id = int(self.values[0])
         role = self.guild.get_role(role_id)
 
-        await self.mongo.db["server_config"].update_one(
-            {"guild_id": self.guild_id},
-            {"$set": {f"{self.role_type}_role": role_id}},
-            upsert=True
-        )
+        await self.mongo.update_server_config(self.guild_id, {"$set": {f"{self.role_type}_role": role_id}})
 
         await interaction.response.send_message(
             f"✅ {self.role_type.title()} Pokémon role set to {role.mention}",
@@ -1324,11 +1319,7 @@ class PokemonTypeButtons(discord.ui.View):
             return await interaction.response.send_message("Only the command author can use this.", ephemeral=True)
         selected_types = set(interaction.data.get("values", []))
         try:
-            collection = self.mongo.db[f"{self.collection_type}_types"]
-            await collection.delete_many({"user_id": self.user_id})
-            docs = [{"user_id": self.user_id, "type": t} for t in selected_types]
-            if docs:
-                await collection.insert_many(docs)
+            await self.mongo.set_types(f"{self.collection_type}_types", self.user_id, selected_types)
             self.current_types = list(selected_types)
         except Exception as e:
             return await interaction.response.send_message(f"Database error: {e}", ephemeral=True)
@@ -1475,11 +1466,7 @@ class PokemonRegionButtons(discord.ui.View):
         if interaction.user.id != self.user_id:
             return await interaction.response.send_message("Only the command author can use this.", ephemeral=True)
         try:
-            await self.mongo.db[self.collection_type].update_one(
-                {"user_id": self.user_id},
-                {"$set": {"regions": self.current_regions}},
-                upsert=True
-            )
+            await self.mongo.set_regions(self.collection_type, self.user_id, self.current_regions)
             new_view = PokemonRegionButtons(
                 self.user_id,
                 self.collection_type,
@@ -1537,6 +1524,7 @@ class PokemonRegionButtons(discord.ui.View):
 class Pokemon_Emojis(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.http_client = getattr(bot, "http_client", None)
         self.GUILD_IDS = ["1216270817101611058","1216270002127114340","1216269922263371876","1340447626105065585", "1340447685685153852", "1340447747974762556", "1340447749111545998", "1340447923548459133", "1340447977340145717", "1340448026740916338", "1340448028196212807", "1340448148866469971", "1340448241069723749", "1340448280966074519", "1340448379729346560", "1340448496100053055", "1340448546603667619", "1340448595052335104", "1340448664157687830", "1340448723603296300", "1340448725314703390", "1340448849281548363", "1340449016089153598", "1340449082971390033", "1340449185933299723", "1340449231194030121", "1340449271366815806", "1340449391533625398", "1340449491765166231", "1340449540175691847", "1340698929922183300", "1340699061992558665", "1340699001011437610"]
         self.POKEMON_IMAGES_FOLDER = "data/commands/pokemon/pokemon_emojis"
         self.IMAGE_SOURCES = ["https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/other/official-artwork/{}.png", "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/{}.png", "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/other/home/{}.png"]
@@ -1637,9 +1625,7 @@ class Pokemon_Emojis(commands.Cog):
             self.logger.info("No missing images to download")
             return
         self.logger.info(f"Downloading {len(missing_pokemon_ids)} missing Pokemon images")
-        connector = aiohttp.TCPConnector(limit=100, limit_per_host=20)
-        timeout = aiohttp.ClientTimeout(total=30, connect=10)
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async with shared_session(self.http_client, timeout=aiohttp.ClientTimeout(total=30, connect=10)) as session:
             semaphore = asyncio.Semaphore(50)
             tasks = [self._download_with_semaphore(semaphore, session, pid) for pid in missing_pokemon_ids]
             results = []
@@ -1699,9 +1685,7 @@ class Pokemon_Emojis(commands.Cog):
         self.logger.info("Fetching all Pokemon IDs from PokeAPI...")
         pokemon_ids = []
         invalid_ids = {10265, 10266, 10267, 10268, 10269}
-        connector = aiohttp.TCPConnector(limit=50)
-        timeout = aiohttp.ClientTimeout(total=60)
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async with shared_session(self.http_client, timeout=aiohttp.ClientTimeout(total=60)) as session:
             url = "https://pokeapi.co/api/v2/pokemon"
             all_pokemon = []
             page_count = 0
@@ -1811,8 +1795,7 @@ class Pokemon_Emojis(commands.Cog):
             json.dump(self.emoji_mapping, f, indent=2)
 
     async def create_emoji_image(self, pokemon_id):
-        connector = aiohttp.TCPConnector(limit=10)
-        async with aiohttp.ClientSession(connector=connector) as session:
+        async with shared_session(self.http_client) as session:
             return await self.download_single_image(session, pokemon_id)
 
     async def upload_emojis_for_server(self, servers, global_existing, embed_message=None, ctx=None, embed=None):
@@ -1964,9 +1947,7 @@ class Pokemon_Emojis(commands.Cog):
         embed = discord.Embed(description=f"Force downloading Pokemon {start_id}-{end_id}...", color=discord.Color.orange())
         msg = await ctx.send(embed=embed)
         pokemon_ids = list(range(start_id, end_id + 1))
-        connector = aiohttp.TCPConnector(limit=100, limit_per_host=30)
-        timeout = aiohttp.ClientTimeout(total=30)
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        async with shared_session(self.http_client, timeout=aiohttp.ClientTimeout(total=30)) as session:
             semaphore = asyncio.Semaphore(60)
             tasks = [self._download_with_semaphore(semaphore, session, pid) for pid in pokemon_ids]
             results = []
@@ -2001,23 +1982,39 @@ class Pokemon_Subcogs:
     
 
 class MongoHelper:
+    # Every subscription write stamps updated_at (the spawn cache polls by it) and tells the listeners
+    listeners = []
     def __init__(self, db): self.db = db
+    def notify(self, op, col, uid, pokemon=None):
+        for listener in MongoHelper.listeners:
+            try: listener(op, col, uid, pokemon)
+            except Exception as e: logger.warning(f"MongoHelper listener failed on {op} {col}: {e}")
+    @staticmethod
+    def stamp(update): return {**update, "$set": {**update.get("$set", {}), "updated_at": datetime.now(timezone.utc)}}
     async def add(self, col, pokemon, uid):
         c, d = self.db[col], await self.db[col].find_one({"user_id": uid})
-        if not d: await c.insert_one({"user_id": uid, "pokemon": [pokemon]}); return True
+        if not d: await c.insert_one({"user_id": uid, "pokemon": [pokemon], "updated_at": datetime.now(timezone.utc)}); self.notify("add", col, uid, pokemon); return True
         if pokemon in d["pokemon"]: return False
-        await c.update_one({"user_id": uid}, {"$push": {"pokemon": pokemon}}); return True
+        await c.update_one({"user_id": uid}, self.stamp({"$push": {"pokemon": pokemon}})); self.notify("add", col, uid, pokemon); return True
     async def remove(self, col, pokemon, uid):
         d = await self.db[col].find_one({"user_id": uid})
         if not d or pokemon not in d["pokemon"]: return False
-        await self.db[col].update_one({"user_id": uid}, {"$pull": {"pokemon": pokemon}}); return True
+        await self.db[col].update_one({"user_id": uid}, self.stamp({"$pull": {"pokemon": pokemon}})); self.notify("remove", col, uid, pokemon); return True
     async def list(self, col, uid):
         d = await self.db[col].find_one({"user_id": uid})
         return d["pokemon"] if d else []
     async def replace(self, col, pokemon, uid):
-        await self.db[col].update_one({"user_id": uid}, {"$set": {"pokemon": [pokemon]}}, upsert=True); return True
+        await self.db[col].update_one({"user_id": uid}, self.stamp({"$set": {"pokemon": [pokemon]}}), upsert=True); self.notify("replace", col, uid, pokemon); return True
     async def clear(self, col, uid):
-        await self.db[col].update_one({"user_id": uid}, {"$set": {"pokemon": []}}); return True
+        await self.db[col].update_one({"user_id": uid}, self.stamp({"$set": {"pokemon": []}})); self.notify("clear", col, uid); return True
+    async def update_server_config(self, guild_id, update):
+        await self.db["server_config"].update_one({"guild_id": guild_id}, self.stamp(update), upsert=True); self.notify("config", "server_config", guild_id)
+    async def set_types(self, col, uid, types):
+        await self.db[col].delete_many({"user_id": uid})
+        if types: await self.db[col].insert_many([{"user_id": uid, "type": t, "updated_at": datetime.now(timezone.utc)} for t in types])
+        self.notify("set", col, uid)
+    async def set_regions(self, col, uid, regions):
+        await self.db[col].update_one({"user_id": uid}, self.stamp({"$set": {"regions": regions}}), upsert=True); self.notify("set", col, uid)
 
 class PokemonNameHelper:
     def __init__(self, csv_file=None):
@@ -0,0 +1,155 @@
+import io
+import numpy as np
+from PIL import Image
+
+
+# NumPy port of ColorThief's MMCQ (modified median cut quantization). The
+# histogram and box sums are vectorized, the box bookkeeping mirrors
+# colorthief 0.2.1 so palettes come out the same.
+SIGBITS = 5
+RSHIFT = 8 - SIGBITS
+MAX_ITERATION = 1000
+FRACT_BY_POPULATIONS = 0.75
+
+
+class VBox:
+    def __init__(self, bounds, histo):
+        self.bounds = list(bounds)
+        self.histo = histo
+        self._count = None
+
+    @property
+    def slices(self):
+        r1, r2, g1, g2, b1, b2 = self.bounds
+        return self.histo[r1:r2 + 1, g1:g2 + 1, b1:b2 + 1]
+
+    @property
+    def count(self):
+        if self._count is None:
+            self._count = int(self.slices.sum())
+        return self._count
+
+    @property
+    def volume(self):
+        r1, r2, g1, g2, b1, b2 = self.bounds
+        return (r2 - r1 + 1) * (g2 - g1 + 1) * (b2 - b1 + 1)
+
+    def copy(self):
+        return VBox(self.bounds, self.histo)
+
+    @property
+    def avg(self):
+        r1, r2, g1, g2, b1, b2 = self.bounds
+        mult = 1 << RSHIFT
+        box = self.slices
+        total = box.sum()
+        if not total:
+            return (int(mult * (r1 + r2 + 1) / 2), int(mult * (g1 + g2 + 1) / 2), int(mult * (b1 + b2 + 1) / 2))
+        return tuple(
+            int(float((box.sum(axis=tuple(a for a in range(3) if a != axis)) * (np.arange(lo, hi + 1) + 0.5) * mult).sum()) / total)
+            for axis, (lo, hi) in enumerate(((r1, r2), (g1, g2), (b1, b2)))
+        )
+
+
+class PQueue:
+    def __init__(self, sort_key):
+        self.sort_key = sort_key
+        self.contents = []
+
+    def push(self, item):
+        self.contents.append(item)
+
+    def pop(self):
+        self.contents.sort(key=self.sort_key)
+        return self.contents.pop()
+
+    def size(self):
+        return len(self.contents)
+
+
+def median_cut(vbox):
+    if not vbox.count:
+        return None, None
+    if vbox.count == 1:
+        return vbox.copy(), None
+    widths = [vbox.bounds[1] - vbox.bounds[0] + 1, vbox.bounds[3] - vbox.bounds[2] + 1, vbox.bounds[5] - vbox.bounds[4] + 1]
+    axis = widths.index(max(widths))
+    lo, hi = vbox.bounds[axis * 2], vbox.bounds[axis * 2 + 1]
+    partial = np.cumsum(vbox.slices.sum(axis=tuple(a for a in range(3) if a != axis)))
+    total = int(partial[-1])
+    partialsum = {lo + i: int(v) for i, v in enumerate(partial)}
+    lookaheadsum = {i: total - v for i, v in partialsum.items()}
+    for i in range(lo, hi + 1):
+        if partialsum[i] > total / 2:
+            vbox1, vbox2 = vbox.copy(), vbox.copy()
+            left, right = i - lo, hi - i
+            d2 = min(hi - 1, int(i + right / 2)) if left <= right else max(lo, int(i - 1 - left / 2))
+            while not partialsum.get(d2, False):
+                d2 += 1
+            count2 = lookaheadsum.get(d2)
+            while not count2 and partialsum.get(d2 - 1, False):
+                d2 -= 1
+                count2 = lookaheadsum.get(d2)
+            vbox1.bounds[axis * 2 + 1] = d2
+            vbox2.bounds[axis * 2] = d2 + 1
+            return vbox1, vbox2
+    return None, None
+
+
+def iterate(queue, target):
+    n_color, n_iter = 1, 0
+    while n_iter < MAX_ITERATION:
+        vbox = queue.pop()
+        if not vbox.count:
+            queue.push(vbox)
+            n_iter += 1
+            continue
+        vbox1, vbox2 = median_cut(vbox)
+        if not vbox1:
+            raise Exception("vbox1 not defined; shouldn't happen!")
+        queue.push(vbox1)
+        if vbox2:
+            queue.push(vbox2)
+            n_color += 1
+        if n_color >= target:
+            return
+        n_iter += 1
+
+
+def load_pixels(image, quality=1, max_size=None):
+    if isinstance(image, (bytes, bytearray)):
+        image = io.BytesIO(image)
+    if not isinstance(image, Image.Image):
+        image = Image.open(image)
+    if max_size and max(image.size) > max_size:
+        image = image.copy()
+        image.thumbnail((max_size, max_size), Image.BILINEAR)
+    pixels = np.asarray(image.convert("RGBA")).reshape(-1, 4)[::quality]
+    opaque = pixels[:, 3] >= 125
+    not_white = ~((pixels[:, 0] > 250) & (pixels[:, 1] > 250) & (pixels[:, 2] > 250))
+    return pixels[opaque & not_white, :3]
+
+
+def get_palette(image, color_count=10, quality=1, max_size=None):
+    pixels = load_pixels(image, quality, max_size)
+    if not len(pixels):
+        raise Exception("Empty pixels when quantize.")
+    quantized = (pixels >> RSHIFT).astype(np.intp)
+    index = (quantized[:, 0] << (2 * SIGBITS)) + (quantized[:, 1] << SIGBITS) + quantized[:, 2]
+    histo = np.bincount(index, minlength=1 << (3 * SIGBITS)).reshape((1 << SIGBITS,) * 3)
+    mins, maxs = quantized.min(axis=0), quantized.max(axis=0)
+    queue = PQueue(lambda v: v.count)
+    queue.push(VBox((mins[0], maxs[0], mins[1], maxs[1], mins[2], maxs[2]), histo))
+    iterate(queue, FRACT_BY_POPULATIONS * color_count)
+    queue2 = PQueue(lambda v: v.count * v.volume)
+    while queue.size():
+        queue2.push(queue.pop())
+    iterate(queue2, color_count - queue2.size())
+    palette = []
+    while queue2.size():
+        palette.append(queue2.pop().avg)
+    return palette
+
+
+def get_dominant_color(image, quality=1, max_size=None):
+    return get_palette(image, 5, quality, max_size)[0]
@@ -1,15 +1,457 @@
-import os, io, re, csv, json, logging, requests, aiohttp
+import os, io, re, csv, json, math, time, bisect, shutil, asyncio, hashlib, logging, requests, aiohttp, discord, threading, multiprocessing
+from datetime import datetime, timedelta, timezone
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from PIL import Image, ImageDraw, ImageFont, ImageEnhance, ImageFilter, ImageSequence
-from colorthief import ColorThief
 from pilmoji import Pilmoji
+from pilmoji.source import BaseSource
 from fuzzywuzzy import fuzz
+from lib.config.spawns import spawn_config
+from lib.utils.http import shared_session, pooled_requests_session
+from lib.utils.color import get_dominant_color
 
 
 
 logger = logging.getLogger(__name__)
 
+class PokemonAliasTable:
+    def __init__(self, names_file, alias_file, threshold=85):
+        self.names_file = names_file
+        self.alias_file = alias_file
+        self.threshold = threshold
+        self.aliases = {}
+
+    def source_hash(self):
+        with open(self.names_file, 'rb') as f:
+            return hashlib.sha1(f.read()).hexdigest()
+
+    def load(self):
+        try:
+            source = self.source_hash()
+        except OSError as e:
+            logger.warning(f"Failed to read Pokémon names for alias table: {e}")
+            return self
+        try:
+            with open(self.alias_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("source") == source and data.get("threshold") == self.threshold:
+                self.aliases = {slug: frozenset(names) for slug, names in data["aliases"].items()}
+                return self
+        except (OSError, ValueError, KeyError):
+            pass
+        self.aliases = self.build()
+        with open(self.alias_file, 'w', encoding='utf-8') as f:
+            json.dump({
+                "source": source,
+                "threshold": self.threshold,
+                "aliases": {slug: sorted(names) for slug, names in sorted(self.aliases.items())}
+            }, f, indent=1)
+        logger.info(f"Built Pokémon alias table: {len(self.aliases)} slugs with fuzzy aliases")
+        return self
+
+    def build(self):
+        with open(self.names_file, 'r', encoding='utf-8') as f:
+            names = sorted({row['name'].strip().lower() for row in csv.DictReader(f) if row.get('name')})
+        aliases = {}
+        for i, a in enumerate(names):
+            for b in names[i + 1:]:
+                # fuzz.ratio can only exceed the threshold when the lengths are close enough
+                if 200 * min(len(a), len(b)) < (self.threshold + 0.5) * (len(a) + len(b)):
+                    continue
+                if fuzz.ratio(a, b) > self.threshold:
+                    aliases.setdefault(a, set()).add(b)
+                    aliases.setdefault(b, set()).add(a)
+        return {slug: frozenset(names) for slug, names in aliases.items()}
+
+    def expand(self, slug):
+        slug = slug.strip().lower()
+        return self.aliases.get(slug, frozenset()) | {slug}
+
+
+class SpecialNameMatcher:
+    # Aho-Corasick automaton over the rare/regional substrings; "^" anchors a pattern to the start of the slug
+    RARE, REGIONAL = 1, 2
+
+    def __init__(self, path, regional_forms=(), slugs=(), reload_interval=30):
+        self.path = path
+        self.prefixes = [f"^{form.lower()}-" for form in regional_forms]
+        self.slugs = {slug.lower() for slug in slugs}
+        self.reload_interval = reload_interval
+        self.mtime = None
+        self.next_check = 0.0
+        self.goto, self.fail, self.out = [{}], [0], [0]
+        self.classes = {}
+
+    @staticmethod
+    def compile(patterns):
+        goto, out = [{}], [0]
+        for pattern, flag in patterns:
+            node = 0
+            for ch in pattern:
+                if ch not in goto[node]:
+                    goto[node][ch] = len(goto)
+                    goto.append({})
+                    out.append(0)
+                node = goto[node][ch]
+            out[node] |= flag
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in goto[node].items():
+                f = fail[node]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                if node:
+                    fail[child] = goto[f].get(ch, 0)
+                    out[child] |= out[fail[child]]
+                queue.append(child)
+        return goto, fail, out
+
+    def scan(self, slug):
+        goto, fail, out = self.goto, self.fail, self.out
+        node = flags = 0
+        for ch in "^" + slug:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            flags |= out[node]
+        return flags
+
+    def load(self):
+        patterns = [(prefix, self.REGIONAL) for prefix in self.prefixes]
+        try:
+            self.mtime = os.stat(self.path).st_mtime_ns
+            with open(self.path, 'r', newline='', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                for row in reader:
+                    for value, flag in zip(row, (self.RARE, self.REGIONAL)):
+                        if value := value.strip().lower():
+                            patterns.append((value, flag))
+        except FileNotFoundError:
+            self.mtime = None
+        except Exception as e:
+            logger.warning(f"Failed to load special names from {self.path}: {e}")
+            return self
+        self.goto, self.fail, self.out = self.compile(patterns)
+        self.classes = {slug: self.scan(slug) for slug in self.slugs}
+        self.next_check = time.monotonic() + self.reload_interval
+        return self
+
+    def refresh(self):
+        now = time.monotonic()
+        if now < self.next_check:
+            return
+        self.next_check = now + self.reload_interval
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self.mtime:
+            self.load()
+
+    def classify(self, slug):
+        self.refresh()
+        slug = slug.lower()
+        if (flags := self.classes.get(slug)) is None:
+            flags = self.classes[slug] = self.scan(slug)
+        return bool(flags & self.RARE), bool(flags & self.REGIONAL)
+
+
+class AltNameTable:
+    # Alt names and the card's best latin alt name per slug, resolved once from alt_names.csv and flag.json
+    NORMAL_NAME = re.compile(r"[A-Za-z0-9\- ']+")
+
+    def __init__(self, alt_names_file, flag_file):
+        self.alt_names_file = alt_names_file
+        self.flag_file = flag_file
+        self.names = {}
+        self.best = {}
+
+    def load(self):
+        try:
+            with open(self.flag_file, 'r', encoding='utf-8') as f:
+                flags = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load alt-name flags from {self.flag_file}: {e}")
+            flags = {}
+        try:
+            with open(self.alt_names_file, 'r', newline='', encoding='utf-8') as f:
+                rows = list(csv.DictReader(f))
+        except OSError as e:
+            logger.warning(f"Failed to load alt names from {self.alt_names_file}: {e}")
+            return self
+        missing = {}
+        for row in rows:
+            slug = row.pop("pokemon_species").strip().lower()
+            names = {lang: name.strip() for lang, name in row.items() if lang and name and name.strip()}
+            self.names[slug] = tuple(names.values())
+            candidates = []
+            for lang, name in names.items():
+                if not self.NORMAL_NAME.fullmatch(name) or name.lower() == slug:
+                    continue
+                if not (flag := flags.get(lang, '')):
+                    missing[lang] = missing.get(lang, 0) + 1
+                candidates.append((flag, name))
+            if candidates:
+                flag, name = min(candidates, key=lambda x: (len(x[1]), 0 if x[0] else 1))
+                self.best[slug] = f"{flag} {name}" if flag else name
+        if missing:
+            logger.warning("No flag for alt-name languages: " + ", ".join(f"{lang} ({count} names)" for lang, count in sorted(missing.items())))
+        return self
+
+
+class SubscriptionIndex:
+    def __init__(self, collections=("shiny_hunt", "collection"), aliases=None):
+        self.collections = collections
+        self.aliases = aliases
+        self.ready = False
+        self._building = False
+        self._pending = []
+        self._slugs = {col: {} for col in collections}
+        self._users = {col: {} for col in collections}
+
+    @staticmethod
+    def canonical(name):
+        return name.strip().lower()
+
+    def begin_build(self):
+        self._building = True
+
+    def finish_build(self):
+        self._building = False
+        for write in self._pending:
+            self.on_write(*write)
+        self._pending.clear()
+        self.ready = True
+
+    def link(self, col, uid, pokemon):
+        slug = self.canonical(pokemon)
+        self._users[col].setdefault(uid, set()).add(slug)
+        self._slugs[col].setdefault(slug, set()).add(uid)
+
+    def unlink(self, col, uid, pokemon):
+        slug = self.canonical(pokemon)
+        self._users[col].get(uid, set()).discard(slug)
+        users = self._slugs[col].get(slug)
+        if users is not None:
+            users.discard(uid)
+            if not users:
+                del self._slugs[col][slug]
+
+    def set_user(self, col, uid, pokemon):
+        for slug in list(self._users[col].get(uid, ())):
+            self.unlink(col, uid, slug)
+        for name in pokemon:
+            self.link(col, uid, name)
+        if not self._users[col].get(uid):
+            self._users[col].pop(uid, None)
+
+    def on_write(self, op, col, uid, pokemon=None):
+        if col not in self._slugs:
+            return
+        if self._building:
+            self._pending.append((op, col, uid, pokemon))
+            return
+        if op == "add":
+            self.link(col, uid, pokemon)
+        elif op == "remove":
+            self.unlink(col, uid, pokemon)
+        elif op == "replace":
+            self.set_user(col, uid, [pokemon])
+        elif op == "clear":
+            self.set_user(col, uid, [])
+
+    def subscribers(self, col, slug):
+        if not self.aliases:
+            return self._slugs[col].get(self.canonical(slug), set())
+        return set().union(*(self._slugs[col].get(name, ()) for name in self.aliases.expand(slug)))
+
+
+class SubscriptionCache:
+    COLLECTIONS = ("shiny_hunt", "collection", "type_ping_types", "quest_ping", "server_config")
+    KEYS = {"shiny_hunt": "user_id", "collection": "user_id", "type_ping_types": "user_id", "quest_ping": "user_id", "server_config": "guild_id"}
+    POLL_OVERLAP = timedelta(seconds=5)
+
+    def __init__(self, mongo, index, poll_interval=30, reconcile_interval=900):
+        self.mongo = mongo
+        self.index = index
+        self.poll_interval = poll_interval
+        self.reconcile_interval = reconcile_interval
+        self.ready = False
+        self.mode = None
+        self._task = None
+        self._reloads = set()
+        self._synced_at = None
+        self._docs = {col: {} for col in self.COLLECTIONS}
+        self._types = {}
+        self._regions = {}
+        self._configs = {}
+        self._names = {self.mongo.db[col].name: col for col in self.COLLECTIONS}
+
+    def start(self):
+        if not self._task:
+            self._task = asyncio.create_task(self.run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        for task in self._reloads:
+            task.cancel()
+
+    async def run(self):
+        try:
+            await self.watch()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Change streams unavailable, polling subscriptions every {self.poll_interval}s: {e}")
+        self.mode = "polling"
+        await self.create_indexes()
+        reconciled = 0.0
+        while True:
+            try:
+                # A full content diff every reconcile_interval catches deletes and edits that never stamped updated_at
+                if not self.ready or time.monotonic() - reconciled >= self.reconcile_interval:
+                    await self.hydrate()
+                    reconciled = time.monotonic()
+                else:
+                    await self.poll()
+            except Exception as e:
+                logger.warning(f"Subscription poll failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def watch(self):
+        pipeline = [{"$match": {"ns.coll": {"$in": list(self._names)}}}]
+        async with self.mongo.db.database.watch(pipeline, full_document="updateLookup") as stream:
+            first = await stream.try_next()
+            await self.hydrate()
+            self.mode = "change_stream"
+            if first:
+                self.apply_change(first)
+            async for change in stream:
+                self.apply_change(change)
+
+    async def create_indexes(self):
+        try:
+            await asyncio.gather(*(self.mongo.db[col].create_index("updated_at") for col in self.COLLECTIONS))
+        except Exception as e:
+            logger.warning(f"Could not index updated_at for subscription polling: {e}")
+
+    async def hydrate(self):
+        started = datetime.now(timezone.utc)
+        results = await asyncio.gather(*(self.mongo.db[col].find({}).to_list(None) for col in self.COLLECTIONS))
+        self.index.begin_build()
+        try:
+            for col, docs in zip(self.COLLECTIONS, results):
+                current = {doc["_id"]: doc for doc in docs}
+                for doc_id in set(self._docs[col]) - set(current):
+                    self.drop(col, doc_id)
+                for doc_id, doc in current.items():
+                    if self._docs[col].get(doc_id) != doc:
+                        self.put(col, doc)
+        finally:
+            self.index.finish_build()
+        self._synced_at = started
+        if not self.ready:
+            self.ready = True
+            logger.info("Subscription cache hydrated: " + ", ".join(f"{col}={len(self._docs[col])}" for col in self.COLLECTIONS))
+
+    async def poll(self):
+        # Only documents stamped since the last sync; the overlap covers clock skew between writers
+        started = datetime.now(timezone.utc)
+        query = {"updated_at": {"$gte": self._synced_at - self.POLL_OVERLAP}}
+        results = await asyncio.gather(*(self.mongo.db[col].find(query).to_list(None) for col in self.COLLECTIONS))
+        for col, docs in zip(self.COLLECTIONS, results):
+            for doc in docs:
+                if self._docs[col].get(doc["_id"]) != doc:
+                    self.put(col, doc)
+        self._synced_at = started
+
+    def on_write(self, op, col, uid, pokemon=None):
+        # Registered on MongoHelper.listeners so this process's own writes don't wait for the next poll
+        if col not in self.KEYS or not self.ready or self.mode == "change_stream":
+            return
+        task = asyncio.create_task(self.reload(col, uid))
+        self._reloads.add(task)
+        task.add_done_callback(self._reloads.discard)
+
+    async def reload(self, col, key):
+        field = self.KEYS[col]
+        try:
+            docs = await self.mongo.db[col].find({field: key}).to_list(None)
+        except Exception as e:
+            logger.warning(f"Subscription reload of {col} {key} failed: {e}")
+            return
+        current = {doc["_id"]: doc for doc in docs}
+        for doc_id in [doc_id for doc_id, doc in self._docs[col].items() if doc.get(field) == key and doc_id not in current]:
+            self.drop(col, doc_id)
+        for doc_id, doc in current.items():
+            if self._docs[col].get(doc_id) != doc:
+                self.put(col, doc)
+
+    def apply_change(self, change):
+        col = self._names.get(change.get("ns", {}).get("coll"))
+        if not col:
+            return
+        op = change["operationType"]
+        doc_id = change.get("documentKey", {}).get("_id")
+        if op in ("insert", "update", "replace") and change.get("fullDocument"):
+            self.put(col, change["fullDocument"])
+        elif op in ("update", "delete"):
+            self.drop(col, doc_id)
+
+    def put(self, col, doc):
+        old = self._docs[col].get(doc["_id"])
+        if old:
+            self._unlink(col, old)
+        self._docs[col][doc["_id"]] = doc
+        self._link(col, doc)
+
+    def drop(self, col, doc_id):
+        old = self._docs[col].pop(doc_id, None)
+        if old:
+            self._unlink(col, old)
+
+    def _link(self, col, doc):
+        uid = doc.get("user_id")
+        if col in self.index.collections and uid:
+            self.index.set_user(col, uid, doc.get("pokemon", []))
+        elif col == "type_ping_types" and uid and doc.get("type"):
+            self._types.setdefault(doc["type"].lower(), set()).add(uid)
+        elif col == "quest_ping" and uid:
+            for region in doc.get("regions", []):
+                self._regions.setdefault(region.lower(), set()).add(uid)
+        elif col == "server_config" and doc.get("guild_id"):
+            self._configs[doc["guild_id"]] = doc
+
+    def _unlink(self, col, doc):
+        uid = doc.get("user_id")
+        if col in self.index.collections and uid:
+            self.index.set_user(col, uid, [])
+        elif col == "type_ping_types" and doc.get("type"):
+            self._types.get(doc["type"].lower(), set()).discard(uid)
+        elif col == "quest_ping":
+            for region in doc.get("regions", []):
+                self._regions.get(region.lower(), set()).discard(uid)
+        elif col == "server_config":
+            self._configs.pop(doc.get("guild_id"), None)
+
+    def type_subscribers(self, ptype):
+        return self._types.get(ptype.lower(), set())
+
+    def quest_subscribers(self, region):
+        return self._regions.get(region.lower(), set())
+
+    def server_config(self, guild_id):
+        return dict(self._configs.get(guild_id, {}))
+
+
 class PokemonUtils:
-    def __init__(self, mongo, type_emojis_file, quest_emojis_file, description_file, id_file, regional_forms, lang_flags, bot=None, pp=None):
+    def __init__(self, mongo, type_emojis_file, quest_emojis_file, description_file, id_file, regional_forms, lang_flags, bot=None, pp=None, lookup_timeout=2.0, subscriptions=None, aliases=None, color_table=None):
         self.mongo = mongo
         self.type_emojis_file = type_emojis_file
         self.quest_emojis_file = quest_emojis_file
@@ -19,10 +461,19 @@ class PokemonUtils:
         self.lang_flags = lang_flags
         self.bot = bot  # Pass bot here explicitly if needed for async data access
         self.pp = pp
+        self.lookup_timeout = lookup_timeout
+        self.subscriptions = subscriptions
+        self.aliases = aliases
+        self.color_table = color_table
 
         self._type_emojis = {}
         self._quest_emojis = {}
         self.load_emojis()
+        # Spawns only ever look these up, so descriptions.csv and the ID list are read once here
+        self.rows = self.load_pokemon_rows()
+        self.pokemon_ids = self.load_pokemon_ids()
+        self.types = {slug: self.row_types(row) for slug, row in self.rows.items()}
+        self.regions = {slug: row.get("region", "").strip().lower() for slug, row in self.rows.items()}
 
     def load_emojis(self):
         for file, attr in [(self.type_emojis_file, "_type_emojis"), (self.quest_emojis_file, "_quest_emojis")]:
@@ -60,24 +511,30 @@ class PokemonUtils:
         return name.replace('-', ' ').title()
 
     def get_pokemon_row(self, slug):
-        try:
-            with open(self.pokemon_description_file, 'r', encoding='utf-8') as f:
-                for row in csv.DictReader(f):
-                    if row.get("slug", "").lower() == slug.lower():
-                        return row
-        except FileNotFoundError:
-            pass
-        return None
+        return self.rows.get(slug.lower())
 
     def get_description(self, slug):
         row = self.get_pokemon_row(slug)
         if row:
             return row.get("description", ""), row.get("dex_number", "???"), row
-        fallback_id = self.load_pokemon_ids().get(slug.lower(), "???")
+        fallback_id = self.pokemon_ids.get(slug.lower(), "???")
         return "", fallback_id, {}
 
+    def load_pokemon_rows(self):
+        rows = {}
+        try:
+            with open(self.pokemon_description_file, 'r', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    rows.setdefault(row.get("slug", "").lower(), row)
+        except FileNotFoundError:
+            pass
+        return rows
+
     def get_pokemon_types(self, slug):
-        row = self.get_pokemon_row(slug)
+        return self.types.get(slug.lower(), [])
+
+    @staticmethod
+    def row_types(row):
         if not row:
             return []
         types = []
@@ -93,8 +550,24 @@ class PokemonUtils:
             return ""
         return row.get("region", "").capitalize()
 
+    async def bounded_lookup(self, name, coro, default, timeout=None):
+        try:
+            return await asyncio.wait_for(coro, timeout or self.lookup_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Lookup {name} timed out")
+        except Exception as e:
+            logger.warning(f"Lookup {name} failed: {e}")
+        return default
+
+    async def fan_out(self, lookups, deadline):
+        names = list(lookups)
+        results = await asyncio.gather(*(self.bounded_lookup(name, *lookups[name], timeout=deadline) for name in names))
+        return dict(zip(names, results))
+
     async def get_server_config(self, guild_id):
-        return await self.mongo.db["server_config"].find_one({"guild_id": guild_id}) or {}
+        if self.subscriptions and self.subscriptions.ready:
+            return self.subscriptions.server_config(guild_id)
+        return await self.bounded_lookup("server_config", self.mongo.db["server_config"].find_one({"guild_id": guild_id}), None) or {}
 
     async def get_type_ping_users(self, guild, pokemon_name):
         try:
@@ -113,16 +586,19 @@ class PokemonUtils:
             if not pokemon_types:
                 return {}
 
+            if self.subscriptions and self.subscriptions.ready:
+                type_users = [self.subscriptions.type_subscribers(ptype) for ptype in pokemon_types]
+            else:
+                type_docs = await asyncio.gather(*(
+                    self.bounded_lookup(f"type_ping_types:{ptype.lower()}", self.mongo.db["type_ping_types"].find({"type": ptype.lower()}).to_list(None), [])
+                    for ptype in pokemon_types
+                ))
+                type_users = [{user["user_id"] for user in users if user.get("user_id")} for users in type_docs]
             type_pings = {}
-            for ptype in pokemon_types:
+            for ptype, uids in zip(pokemon_types, type_users):
                 ptype_lower = ptype.lower()
                 emoji = self._type_emojis.get(f"{ptype_lower}_type", "")
-                users = await self.mongo.db["type_ping_types"].find({"type": ptype_lower}).to_list(None)
-                mentions = {
-                    f"<@{user['user_id']}>"
-                    for user in users
-                    if user.get("user_id") and guild.get_member(user["user_id"])
-                }
+                mentions = {f"<@{uid}>" for uid in uids if guild.get_member(uid)}
                 if mentions:
                     label = f"{emoji} {ptype.capitalize()} Type".strip()
                     type_pings[label] = "".join(sorted(mentions))
@@ -133,48 +609,369 @@ class PokemonUtils:
 
     async def get_quest_ping_users(self, guild, pokemon_name):
         try:
-            with open(self.pokemon_description_file, 'r', encoding='utf-8') as f:
-                region = next((row['region'].lower() for row in csv.DictReader(f) if row.get("slug", "").lower() == pokemon_name.lower()), None)
+            region = self.regions.get(pokemon_name.lower())
             if not region:
                 return []
-            users = await self.mongo.db["quest_ping"].find({}).to_list(None)
+            if self.subscriptions and self.subscriptions.ready:
+                return [f"<@{uid}>" for uid in self.subscriptions.quest_subscribers(region) if guild.get_member(uid)]
+            users = await self.bounded_lookup("quest_ping", self.mongo.db["quest_ping"].find({}).to_list(None), [])
             return [f"<@{u['user_id']}>" for u in users if guild.get_member(u["user_id"]) and region in [r.lower() for r in u.get("regions", [])]]
         except Exception as e:
             logger.warning(f"Error in get_quest_ping_users: {e}")
             return []
 
     async def get_ping_users(self, guild, pokemon_name):
-        def fuzzy(t, n): return t == n or fuzz.ratio(t, n) > 85
+        names = self.aliases.expand(pokemon_name) if self.aliases else {pokemon_name.lower()}
+        def matches(u): return any(p.lower() in names for p in u.get("pokemon", []))
+        if self.subscriptions and self.subscriptions.ready:
+            return tuple(
+                [f"<@{uid}>" for uid in self.subscriptions.index.subscribers(col, pokemon_name) if guild.get_member(uid)]
+                for col in ("shiny_hunt", "collection")
+            )
         try:
-            shiny = await self.mongo.db["shiny_hunt"].find({}).to_list(None)
-            collect = await self.mongo.db["collection"].find({}).to_list(None)
-            shiny_mentions = [f"<@{u['user_id']}>" for u in shiny if any(fuzzy(pokemon_name.lower(), p.lower()) for p in u.get("pokemon", [])) and guild.get_member(u["user_id"])]
-            collect_mentions = [f"<@{u['user_id']}>" for u in collect if any(fuzzy(pokemon_name.lower(), p.lower()) for p in u.get("pokemon", [])) and guild.get_member(u["user_id"])]
+            shiny, collect = await asyncio.gather(
+                self.bounded_lookup("shiny_hunt", self.mongo.db["shiny_hunt"].find({}).to_list(None), []),
+                self.bounded_lookup("collection", self.mongo.db["collection"].find({}).to_list(None), [])
+            )
+            shiny_mentions = [f"<@{u['user_id']}>" for u in shiny if matches(u) and guild.get_member(u["user_id"])]
+            collect_mentions = [f"<@{u['user_id']}>" for u in collect if matches(u) and guild.get_member(u["user_id"])]
             return shiny_mentions, collect_mentions
         except Exception as e:
             logger.warning(f"Error in get_ping_users: {e}")
             return [], []
 
-    async def get_image_color(self, url):
-        fallback = 0x3498db
+    async def get_image_color(self, url, fallback=0x3498db):
         try:
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
+            async with shared_session(getattr(self.bot, "http_client", None)) as session:
                 async with session.get(url) as resp:
                     if resp.status != 200:
                         return fallback
                     data = await resp.read()
-            with io.BytesIO(data) as img_bytes:
-                color_thief = ColorThief(img_bytes)
-                r, g, b = color_thief.get_color(quality=1)
-                return (r << 16) + (g << 8) + b
+            return await asyncio.get_event_loop().run_in_executor(None, dominant_color, data)
         except Exception as e:
             logger.warning(f"Failed to get image color: {e}")
             return fallback
 
+    async def get_dex_color(self, dex_number, url, fallback=0x3498db):
+        if self.color_table and (color := self.color_table.get(dex_number)) is not None:
+            return color
+        color = await self.get_image_color(url, fallback=None)
+        if color is None:
+            return fallback
+        if self.color_table and str(dex_number).isdigit():
+            await asyncio.get_event_loop().run_in_executor(None, self.color_table.add, dex_number, color)
+        return color
+
+    def load_dex_numbers(self):
+        dex_numbers = {int(pid) for pid in self.load_pokemon_ids().values() if str(pid).isdigit()}
+        try:
+            with open(self.pokemon_description_file, 'r', encoding='utf-8') as f:
+                dex_numbers.update(int(row['dex_number']) for row in csv.DictReader(f) if row.get('dex_number', '').isdigit())
+        except FileNotFoundError:
+            pass
+        return sorted(dex_numbers)
+
+
+def dominant_color(image_bytes):
+    r, g, b = get_dominant_color(image_bytes)
+    return (r << 16) + (g << 8) + b
+
+
+class DominantColorTable:
+    def __init__(self, path):
+        self.path = path
+        self.colors = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.colors = {int(row['dex_number']): int(row['color'], 16) for row in csv.DictReader(f)}
+        except FileNotFoundError:
+            self.colors = {}
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Failed to load dominant colour table: {e}")
+        return self
+
+    def get(self, dex_number):
+        try:
+            return self.colors.get(int(dex_number))
+        except (TypeError, ValueError):
+            return None
+
+    def add(self, dex_number, color):
+        # Called from executor threads, possibly while build() rewrites the file
+        with self._lock:
+            new_file = not os.path.exists(self.path)
+            self.colors[int(dex_number)] = color
+            with open(self.path, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(["dex_number", "color"])
+                writer.writerow([int(dex_number), f"{color:06x}"])
+
+    def save(self):
+        with self._lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerow(["dex_number", "color"])
+                for dex_number, color in sorted(self.colors.items()):
+                    writer.writerow([dex_number, f"{color:06x}"])
+            os.replace(tmp_path, self.path)
+
+    def build(self, dex_numbers, artwork):
+        built = 0
+        for dex_number in dex_numbers:
+            try:
+                color = dominant_color(artwork.read_bytes(dex_number))
+                with self._lock:
+                    self.colors[int(dex_number)] = color
+                built += 1
+            except Exception as e:
+                logger.debug(f"Failed to compute colour for {dex_number}: {e}")
+        self.save()
+        return built
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    # OrderedDict LRU behind a lock, so thread-mode CPU workers can share it
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                return default
+            return self._entries[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while self.max_entries is not None and len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._entries))
+
+
+class ArtworkStore:
+    def __init__(self, cache_dir, base_url, max_disk_bytes=256 * 1024 * 1024, max_memory=256, source_dir=None, timeout=10, session=None):
+        self.cache_dir = cache_dir
+        self.base_url = base_url
+        self.max_disk_bytes = max_disk_bytes
+        self.max_memory = max_memory
+        self.source_dir = source_dir
+        self.timeout = timeout
+        self._images = LRUCache(max_memory)
+        self._session = session or pooled_requests_session()
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.scan()
+
+    def path(self, pokemon_id):
+        return os.path.join(self.cache_dir, f"{int(pokemon_id)}.png")
+
+    def get(self, pokemon_id):
+        pokemon_id = int(pokemon_id)
+        if (entry := self._images.get(pokemon_id)) is not None:
+            return entry
+        content = self.read_bytes(pokemon_id)
+        entry = (Image.open(io.BytesIO(content)).convert("RGBA"), content)
+        entry[0].load()
+        return self._images.put(pokemon_id, entry)
+
+    def read_bytes(self, pokemon_id):
+        path = self.path(pokemon_id)
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+            os.utime(path)
+            self.track(os.path.basename(path), len(content))
+            return content
+        except OSError:
+            pass
+        content = self.fetch(pokemon_id)
+        self.write(pokemon_id, content)
+        return content
+
+    def fetch(self, pokemon_id):
+        if self.source_dir:
+            with open(os.path.join(self.source_dir, f"{pokemon_id}.png"), 'rb') as f:
+                return f.read()
+        response = self._session.get(f"{self.base_url}{pokemon_id}.png", timeout=self.timeout)
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch image for ID {pokemon_id}")
+        return response.content
+
+    def prefetch(self, pokemon_id):
+        if not os.path.exists(self.path(pokemon_id)):
+            self.write(pokemon_id, self.fetch(pokemon_id))
+
+    def write(self, pokemon_id, content):
+        tmp_path = f"{self.path(pokemon_id)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, self.path(pokemon_id))
+        if self.track(os.path.basename(self.path(pokemon_id)), len(content)):
+            self.evict()
+
+    def scan(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".png"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        with self._lock:
+            self._files = OrderedDict((name, size) for _, size, name in sorted(entries))
+            self._disk_bytes = sum(self._files.values())
+
+    def track(self, name, size):
+        # Least recently used first; returns True once the running total passes the cap
+        with self._lock:
+            self._disk_bytes += size - self._files.pop(name, 0)
+            self._files[name] = size
+            return self._disk_bytes > self.max_disk_bytes
+
+    def evict(self):
+        # Worker processes share the directory, so rescan before deleting and trim to 90% so this stays rare
+        self.scan()
+        with self._lock:
+            while self._disk_bytes > self.max_disk_bytes * 0.9 and self._files:
+                name, size = self._files.popitem(last=False)
+                self._disk_bytes -= size
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
+
+    def seed(self, pokemon_ids, workers=16):
+        missing = [pid for pid in pokemon_ids if not os.path.exists(self.path(pid))]
+
+        def seed_one(pokemon_id):
+            try:
+                self.write(pokemon_id, self.fetch(pokemon_id))
+                return True
+            except Exception as e:
+                logger.debug(f"Failed to seed artwork {pokemon_id}: {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            seeded = sum(pool.map(seed_one, missing))
+        return seeded, len(missing)
+
+
+class EmojiAtlas(BaseSource):
+    # Offline Pilmoji source: glyphs come from the atlas directory, bundled PNGs
+    # (twemoji file naming) or the bundled emoji font, never from a CDN
+    def __init__(self, atlas_dir, font_path, asset_dir=None, discord_dir=None, glyph_size=109, max_glyphs=256):
+        self.atlas_dir = atlas_dir
+        self.asset_dir = asset_dir
+        self.discord_dir = discord_dir
+        self.glyph_size = glyph_size
+        self.max_glyphs = max_glyphs
+        self.font = ImageFont.truetype(font_path, glyph_size)
+        self.sources = {}
+        self.glyphs = LRUCache(max_glyphs)
+        os.makedirs(atlas_dir, exist_ok=True)
+
+    @staticmethod
+    def filename(emoji):
+        return "-".join(f"{ord(c):x}" for c in emoji if c != "\ufe0f") + ".png"
+
+    def render(self, emoji):
+        canvas = Image.new("RGBA", (self.glyph_size * 3, self.glyph_size * 2), (0, 0, 0, 0))
+        ImageDraw.Draw(canvas).text((0, 0), emoji, font=self.font, embedded_color=True)
+        bbox = canvas.getbbox()
+        if not bbox:
+            return None
+        with io.BytesIO() as buf:
+            canvas.crop(bbox).save(buf, format="PNG")
+            return buf.getvalue()
+
+    @staticmethod
+    def is_flag(emoji):
+        return len(emoji) == 2 and all(0x1f1e6 <= ord(c) <= 0x1f1ff for c in emoji)
+
+    def load(self, emoji):
+        # Bundled assets win over the atlas; flags are never cached from the font, which only has the letter pair
+        if emoji in self.sources:
+            return self.sources[emoji]
+        name = self.filename(emoji)
+        path = os.path.join(self.atlas_dir, name)
+        flag = self.is_flag(emoji)
+        data = None
+        for candidate in (os.path.join(self.asset_dir, name) if self.asset_dir else None, None if flag else path):
+            if candidate and os.path.exists(candidate):
+                with open(candidate, 'rb') as f:
+                    data = f.read()
+                break
+        if data is None:
+            data = self.render(emoji)
+            if flag:
+                logger.warning(f"No bundled flag asset {name} in {self.asset_dir}, falling back to the emoji font")
+            elif data is not None:
+                with open(path, 'wb') as f:
+                    f.write(data)
+        self.sources[emoji] = data
+        return data
+
+    def seed(self, emojis):
+        for emoji in emojis:
+            self.load(emoji)
+
+    def get_emoji(self, emoji, /):
+        data = self.load(emoji)
+        return io.BytesIO(data) if data else None
+
+    def get_discord_emoji(self, id, /):
+        path = os.path.join(self.discord_dir, f"{id}.png") if self.discord_dir else None
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                return io.BytesIO(f.read())
+        return None
+
+    def glyph(self, emoji, size):
+        # Bitmaps resized once per font size, the same way Pilmoji scales emoji
+        key = (emoji, size)
+        if (glyph := self.glyphs.get(key, _MISSING)) is not _MISSING:
+            return glyph
+        data = self.load(emoji)
+        glyph = None
+        if data:
+            with Image.open(io.BytesIO(data)) as asset:
+                asset = asset.convert("RGBA")
+                glyph = asset.resize((size, math.ceil(asset.height / asset.width * size)), Image.LANCZOS)
+        return self.glyphs.put(key, glyph)
+
 
 class PokemonImageBuilder:
-    def __init__(self):
+    ARTWORK_URL = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/other/official-artwork/"
+    BACKGROUND_COLORS = 192  # palette entries reserved for animated backgrounds, the rest go to the sprite and text
+
+    def __init__(self, artwork_config=None, emoji_config=None):
         self.filepaths = {
             "config": "data/bot/events/poketwo_spawns/image/config.json",
             "type_emojis": "data/bot/cogs/register/type-emojis.json",
@@ -182,30 +979,66 @@ class PokemonImageBuilder:
             "description": "data/bot/cogs/register/description.csv",
             "id": "data/bot/cogs/register/pokemon_names.csv",
             "alt_names": "data/bot/cogs/register/alt_names.csv",
-            "flag_map": "data/bot/cogs/register/flag_map.json",
+            "flag_map": "data/bot/cogs/register/flag.json",
             "special_names": "data/bot/cogs/register/special_names.csv",
             "image_output": "data/events/poketwo_spawns/image/test.png"
         }
 
-        self.base_url = "https://raw.githubusercontent.com/PokeAPI/sprites/master/sprites/pokemon/other/official-artwork/"
+        self.base_url = self.ARTWORK_URL
+        self.session = pooled_requests_session()
+        self.artwork = ArtworkStore(base_url=self.base_url, session=self.session, **(artwork_config or spawn_config["artwork"]))
         self.emoji_icon_dir = "data/commands/pokemon/pokemon_emojis/icons/types"
         os.makedirs(self.emoji_icon_dir, exist_ok=True)
         os.makedirs(os.path.dirname(self.filepaths["image_output"]), exist_ok=True)
 
-        with open(self.filepaths["config"], 'r') as f:
-            self.config = json.load(f)
         with open(self.filepaths["type_emojis"], 'r', encoding='utf-8') as f:
             self.type_emojis = json.load(f)
 
-        self.font_header = ImageFont.truetype(self.config["font_path_header"], self.config["font_size_header"])
-        self.font_base = ImageFont.truetype(self.config["font_path_base"], self.config["font_size_base"])
+        self.emoji_config = emoji_config or spawn_config["emoji"]
+        self.emoji_source = None
+        self.config = {}
+        self.config_hash = None
+        self._config_mtime = None
+        self._config_lock = threading.Lock()
+        self.max_static_layers = 192  # every single and dual type combination (171) fits
+        self.max_text_layers = 1024
+        self.max_backgrounds = 16
+        self.refresh_config()
+
+    def refresh_config(self):
+        # Same hash as SpawnCardCache, so a card can be filed under the config it was actually rendered with
+        with self._config_lock:
+            try:
+                mtime = os.stat(self.filepaths["config"]).st_mtime_ns
+            except OSError:
+                return self.config_hash
+            if mtime == self._config_mtime:
+                return self.config_hash
+            self._config_mtime = mtime
+            with open(self.filepaths["config"], 'rb') as f:
+                raw = f.read()
+            config_hash = hashlib.sha1(raw).hexdigest()[:12]
+            if config_hash == self.config_hash:
+                return config_hash
+            config = json.loads(raw)
+            font_changed = config["font_path_emoji"] != self.config.get("font_path_emoji")
+            self.config = config
+            self.font_header = ImageFont.truetype(config["font_path_header"], config["font_size_header"])
+            self.font_base = ImageFont.truetype(config["font_path_base"], config["font_size_base"])
+            self.load_type_assets()
+            if font_changed:
+                self.emoji_source = EmojiAtlas(font_path=config["font_path_emoji"], discord_dir=self.emoji_icon_dir, **self.emoji_config)
+                self.emoji_source.seed(self.load_flag_emojis())
+            self.strip_layers = LRUCache()
+            self.static_layers = LRUCache(self.max_static_layers)
+            self.text_layers = LRUCache(self.max_text_layers)
+            self.backgrounds = LRUCache(self.max_backgrounds)
+            self.config_hash = config_hash
+            return config_hash
 
     def fetch_pokemon_image(self, pokemon_id):
-        url = f"{self.base_url}{pokemon_id}.png"
-        response = requests.get(url)
-        if response.status_code == 200:
-            return Image.open(io.BytesIO(response.content)).convert("RGBA"), io.BytesIO(response.content)
-        raise Exception(f"Failed to fetch image for ID {pokemon_id}")
+        image, content = self.artwork.get(pokemon_id)
+        return image, io.BytesIO(content)
 
     @staticmethod
     def country_code_to_flag_emoji(cc):
@@ -213,7 +1046,7 @@ class PokemonImageBuilder:
         return "".join(chr(ord(c) + OFFSET) for c in cc.upper())
 
     def get_dominant_color(self, image_bytes_io):
-        return ColorThief(image_bytes_io).get_color(quality=1)
+        return get_dominant_color(image_bytes_io)
 
     def extract_emoji_id(self, emoji_str):
         match = re.search(r"<:.+?:(\d+)>", emoji_str)
@@ -226,7 +1059,7 @@ class PokemonImageBuilder:
         local_path = os.path.join(self.emoji_icon_dir, f"{emoji_id}.png")
         if not os.path.exists(local_path):
             url = f"https://cdn.discordapp.com/emojis/{emoji_id}.png"
-            r = requests.get(url)
+            r = self.session.get(url, timeout=10)
             if r.status_code == 200:
                 with open(local_path, 'wb') as f:
                     f.write(r.content)
@@ -237,16 +1070,13 @@ class PokemonImageBuilder:
     def draw_type_emojis(self, canvas, types, position):
         x, y = position
         spacing = self.config["type_spacing"]
-        icon_size = self.config["type_icon_size"]
 
         if len(types) == 1:
             x += spacing
 
         for type_name in types:
-            emoji_str = self.type_emojis.get(f"{type_name.lower()}_type", "")
-            emoji_img = self.get_or_download_emoji_image(emoji_str)
+            emoji_img = self.type_icons.get(type_name.lower())
             if emoji_img:
-                emoji_img = emoji_img.resize(icon_size)
                 canvas.paste(emoji_img, (x, y), emoji_img)
                 x += spacing
 
@@ -261,29 +1091,89 @@ class PokemonImageBuilder:
         top = (img.height - height) // 2
         return img.crop((left, top, left + width, top + height))
 
-    def get_type_colors(self, types):
-        def lighten_color(rgb, factor=0.45):
-            return tuple(min(int(c + (255 - c) * factor), 255) for c in rgb)
+    @staticmethod
+    def lighten_color(rgb, factor=0.45):
+        return tuple(min(int(c + (255 - c) * factor), 255) for c in rgb)
 
-        colors = []
-        for t in types:
-            emoji_str = self.type_emojis.get(f"{t.lower()}_type", "")
-            emoji_img = self.get_or_download_emoji_image(emoji_str)
+    def load_type_assets(self):
+        # Decode, resize and colour every type icon once so cards never hit disk for them
+        self.type_icons, self.type_colors = {}, {}
+        icon_size = tuple(self.config["type_icon_size"])
+        for key, emoji_str in self.type_emojis.items():
+            if not key.endswith("_type"):
+                continue
+            try:
+                emoji_img = self.get_or_download_emoji_image(emoji_str)
+            except (requests.RequestException, OSError) as e:
+                logger.warning(f"Failed to load type icon {key}: {e}")
+                continue
             if emoji_img:
-                with io.BytesIO() as buf:
-                    emoji_img.save(buf, format="PNG")
-                    buf.seek(0)
-                    dom_color = ColorThief(buf).get_color(quality=1)
-                    colors.append(lighten_color(dom_color))
+                type_name = key[:-len("_type")]
+                self.type_icons[type_name] = emoji_img.resize(icon_size)
+                self.type_colors[type_name] = self.lighten_color(get_dominant_color(emoji_img))
+        self.type_pair_colors = {
+            tuple(sorted((a, b))): self.blend_colors([ca, cb])
+            for a, ca in self.type_colors.items() for b, cb in self.type_colors.items() if a != b
+        }
+
+    def get_type_colors(self, types):
+        colors = [self.type_colors[t.lower()] for t in types if t.lower() in self.type_colors]
         return colors or [(240, 240, 240)]
 
+    def get_background_color(self, types):
+        colors = self.get_type_colors(types)
+        if len(colors) == 2:
+            key = tuple(sorted(t.lower() for t in types))
+            if key in self.type_pair_colors:
+                return self.type_pair_colors[key]
+        return self.blend_colors(colors) if len(colors) > 1 else colors[0]
+
     def blend_colors(self, colors):
         r = sum(c[0] for c in colors) // len(colors)
         g = sum(c[1] for c in colors) // len(colors)
         b = sum(c[2] for c in colors) // len(colors)
         return (r, g, b)
 
-    def prepare_background_frames(self, bg_colors, bg_url=None):
+    def background_key(self, bg_url):
+        return (bg_url, tuple(self.config["canvas_size"]), bool(self.config.get("background_blur", False)))
+
+    def process_background(self, bg_image):
+        # Resized, blurred frames plus a shared palette and the frames already indexed against it
+        width, height = self.config["canvas_size"]
+        blur_enabled = self.config.get("background_blur", False)
+        frames, durations = [], []
+        for frame in ImageSequence.Iterator(bg_image):
+            duration = frame.info.get('duration', 40)
+            frame = self.resize_and_crop(frame.convert("RGBA"), (width, height))
+            if blur_enabled:
+                frame = frame.filter(ImageFilter.GaussianBlur(radius=8))
+            frames.append(frame)
+            durations.append(duration)
+        if len(frames) < 2:
+            return frames[:1], [100], None, None
+        picks = frames[::max(1, len(frames) // 8)][:8]
+        sample = Image.new("RGB", (width // 2, height // 2 * len(picks)))
+        for i, frame in enumerate(picks):
+            sample.paste(frame.convert("RGB").resize((width // 2, height // 2)), (0, height // 2 * i))
+        palette = sample.quantize(colors=self.BACKGROUND_COLORS, method=Image.Quantize.MEDIANCUT)
+        indexed = [frame.convert("RGB").quantize(palette=palette, dither=Image.Dither.NONE) for frame in frames]
+        return frames, durations, palette, indexed
+
+    def load_background(self, bg_url):
+        key = self.background_key(bg_url)
+        if (background := self.backgrounds.get(key)) is not None:
+            return background
+        try:
+            response = self.session.get(bg_url, timeout=5, allow_redirects=True)
+            response.raise_for_status()
+            with Image.open(io.BytesIO(response.content)) as bg_image:
+                background = self.process_background(bg_image)
+        except (requests.RequestException, OSError) as e:
+            logger.warning(f"Failed to load background {bg_url}, using colour fallback: {e}")
+            return None
+        return self.backgrounds.put(key, background)
+
+    def prepare_background_frames(self, bg_color, bg_url=None):
         width, height = self.config["canvas_size"]
         blur_enabled = self.config.get("background_blur", False)
         transparent = self.config.get("transparent_background", False)
@@ -292,36 +1182,43 @@ class PokemonImageBuilder:
             canvas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
             return [canvas], [100]
 
-        if bg_url:
-            try:
-                response = requests.get(bg_url, timeout=5, allow_redirects=True)
-                response.raise_for_status()
-                img_bytes = io.BytesIO(response.content)
-                bg_image = Image.open(img_bytes)
-                frames, durations = [], []
-                for frame in ImageSequence.Iterator(bg_image):
-                    frame = frame.convert("RGBA")
-                    frame = self.resize_and_crop(frame, (width, height))
-                    if blur_enabled:
-                        frame = frame.filter(ImageFilter.GaussianBlur(radius=8))
-                    frames.append(frame)
-                    durations.append(frame.info.get('duration', 40))
-                if not frames:
-                    bg_image = bg_image.convert("RGBA")
-                    bg_image = self.resize_and_crop(bg_image, (width, height))
-                    if blur_enabled:
-                        bg_image = bg_image.filter(ImageFilter.GaussianBlur(radius=8))
-                    return [bg_image], [100]
-                return frames, durations
-            except (requests.RequestException, OSError) as e:
-                print(f"[BG ERROR] Using color fallback. {e}")
+        background = self.load_background(bg_url) if bg_url else None
+        if background:
+            frames, durations = background[:2]
+            return frames, durations
 
-        solid_color = self.blend_colors(bg_colors) if len(bg_colors) > 1 else bg_colors[0]
-        canvas = Image.new("RGBA", (width, height), solid_color + (255,))
+        canvas = Image.new("RGBA", (width, height), bg_color + (255,))
         if blur_enabled:
             canvas = canvas.filter(ImageFilter.GaussianBlur(radius=8))
         return [canvas], [100]
 
+    def encode_animated(self, background, types, poke_img, pokemon_name, best_name, target):
+        # Background frames stay indexed; only the overlay box is composited and
+        # quantized per frame, against the background palette plus overlay colours
+        frames, durations, palette, indexed = background
+        overlay = Image.new("RGBA", frames[0].size, (0, 0, 0, 0))
+        for layer in (self.type_strip(types), self.dynamic_layer(poke_img, pokemon_name, best_name)):
+            if layer:
+                overlay.alpha_composite(*layer)
+        bbox = overlay.getbbox()
+        colors = palette.getpalette()[:self.BACKGROUND_COLORS * 3]
+        if bbox:
+            sample = frames[0].crop(bbox)
+            sample.alpha_composite(overlay.crop(bbox))
+            colors += sample.convert("RGB").quantize(colors=256 - self.BACKGROUND_COLORS, method=Image.Quantize.FASTOCTREE).getpalette()[:(256 - self.BACKGROUND_COLORS) * 3]
+        shared = Image.new("P", (1, 1))
+        shared.putpalette(colors + [0] * (768 - len(colors)))
+        out = []
+        for frame, base in zip(frames, indexed):
+            base = base.copy()
+            base.putpalette(shared.getpalette())
+            if bbox:
+                region = frame.crop(bbox)
+                region.alpha_composite(overlay.crop(bbox))
+                base.paste(region.convert("RGB").quantize(palette=shared, dither=Image.Dither.NONE), bbox[:2])
+            out.append(base)
+        out[0].save(target, format="GIF", save_all=True, append_images=out[1:], duration=durations, loop=0, disposal=1, optimize=False)
+
     def replace_flag_emojis_with_displacement(self, text):
         parts, last_index = [], 0
         for match in re.finditer(r"\{flag_([a-z]{2})\}", text):
@@ -334,10 +1231,24 @@ class PokemonImageBuilder:
             parts.append((text[last_index:], False))
         return parts
 
+    def load_flag_emojis(self):
+        try:
+            with open(self.filepaths["flag_map"], 'r', encoding='utf-8') as f:
+                flags = json.load(f).values()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load flag map for emoji atlas: {e}")
+            return []
+        return {self.country_code_to_flag_emoji(cc) for flag in flags for cc in re.findall(r"\{flag_([a-z]{2})\}", flag)}
+
     def draw_text_with_flag_offset(self, pilmoji, position, text, font, fill, flag_offset=4):
         x, y = position
         parts = self.replace_flag_emojis_with_displacement(text)
         for part, is_flag in parts:
+            glyph = self.emoji_source.glyph(part, font.size) if is_flag else None
+            if glyph:
+                pilmoji.image.alpha_composite(glyph, (x, y + flag_offset))
+                x += glyph.width
+                continue
             width, _ = pilmoji.getsize(part, font=font)
             offset_y = y + flag_offset if is_flag else y
             pilmoji.text((x, offset_y), part, font=font, fill=fill)
@@ -346,25 +1257,722 @@ class PokemonImageBuilder:
     def compose_frame(self, bg_frame, poke_img, pokemon_name, best_name, types):
         frame = bg_frame.copy()
         poke_img_resized = poke_img.resize(self.config["pokemon_image_size"])
-        frame.paste(poke_img_resized, self.config["pokemon_image_position"], poke_img_resized)
+        frame.paste(poke_img_resized, tuple(self.config["pokemon_image_position"]), poke_img_resized)
 
-        pilmoji = Pilmoji(frame)
+        pilmoji = Pilmoji(frame, source=self.emoji_source)
         self.draw_text_with_flag_offset(pilmoji, self.config["pokemon_name_position"], pokemon_name, self.font_header, self.config["name_color"])
         self.draw_text_with_flag_offset(pilmoji, self.config["alt_name_position"], best_name, self.font_base, self.config["alt_color"])
         self.draw_type_emojis(frame, types, self.config["type_position"])
         return frame
 
-    def create_image(self, pokemon_id, pokemon_name, best_name, types, bg_url=None, filename=None):
+    def type_strip(self, types):
+        # Pre-rendered type icon strip, cropped to its own bounding box
+        key = tuple(t.lower() for t in types)
+        if (strip := self.strip_layers.get(key, _MISSING)) is not _MISSING:
+            return strip
+        layer = Image.new("RGBA", tuple(self.config["canvas_size"]), (0, 0, 0, 0))
+        self.draw_type_emojis(layer, types, self.config["type_position"])
+        bbox = layer.getbbox()
+        return self.strip_layers.put(key, (layer.crop(bbox), bbox[:2]) if bbox else None)
+
+    def static_layer(self, types):
+        # Solid background for the type combination with the icon strip baked in
+        key = tuple(t.lower() for t in types)
+        if (layer := self.static_layers.get(key)) is not None:
+            return layer
+        frames, _ = self.prepare_background_frames(self.get_background_color(types))
+        layer = frames[0]
+        strip = self.type_strip(types)
+        if strip:
+            layer.alpha_composite(*strip)
+        return self.static_layers.put(key, layer)
+
+    def text_layer(self, position, text, font, fill):
+        # Names repeat across spawns, so rendered text is kept cropped to its bounding box
+        key = (tuple(position), text, font.path, font.size, fill)
+        if (text_layer := self.text_layers.get(key, _MISSING)) is not _MISSING:
+            return text_layer
+        layer = Image.new("RGBA", tuple(self.config["canvas_size"]), (0, 0, 0, 0))
+        with Pilmoji(layer, source=self.emoji_source) as pilmoji:
+            self.draw_text_with_flag_offset(pilmoji, position, text, font, fill)
+        bbox = layer.getbbox()
+        return self.text_layers.put(key, (layer.crop(bbox), bbox[:2]) if bbox else None)
+
+    def dynamic_layer(self, poke_img, pokemon_name, best_name):
+        # Sprite and text for one spawn, composited once and shared by every frame
+        layer = Image.new("RGBA", tuple(self.config["canvas_size"]), (0, 0, 0, 0))
+        sprite = poke_img.convert("RGBA").resize(self.config["pokemon_image_size"])
+        layer.alpha_composite(sprite, tuple(self.config["pokemon_image_position"]))
+        for text in (
+            self.text_layer(self.config["pokemon_name_position"], pokemon_name, self.font_header, self.config["name_color"]),
+            self.text_layer(self.config["alt_name_position"], best_name, self.font_base, self.config["alt_color"]),
+        ):
+            if text:
+                layer.alpha_composite(*text)
+        bbox = layer.getbbox()
+        return (layer.crop(bbox), bbox[:2]) if bbox else None
+
+    def render_frames(self, types, poke_img, pokemon_name, best_name, bg_frames=None):
+        dynamic = self.dynamic_layer(poke_img, pokemon_name, best_name)
+        if bg_frames is None:
+            bg_frames, strip = [self.static_layer(types)], None
+        else:
+            strip = self.type_strip(types)
+        frames = []
+        for bg_frame in bg_frames:
+            frame = bg_frame.copy()
+            if strip:
+                frame.alpha_composite(*strip)
+            if dynamic:
+                frame.alpha_composite(*dynamic)
+            frames.append(frame)
+        return frames
+
+    def create_image(self, pokemon_id, pokemon_name, best_name, types, bg_url=None, filename=None, in_memory=False):
+        config_hash = self.refresh_config()
         poke_img, img_bytes = self.fetch_pokemon_image(pokemon_id)
-        type_colors = self.get_type_colors(types)
-        bg_frames, durations = self.prepare_background_frames(type_colors, bg_url)
-        frames = [self.compose_frame(bg_frame, poke_img, pokemon_name, best_name, types) for bg_frame in bg_frames]
-        filepath = filename or self.filepaths["image_output"]
-        if len(frames) == 1:
-            frames[0].save(filepath)
+        transparent = self.config.get("transparent_background", False)
+        background = self.load_background(bg_url) if bg_url and not transparent else None
+        target = io.BytesIO() if in_memory else filename or self.filepaths["image_output"]
+        if background and background[2]:
+            fmt = "GIF"
+            self.encode_animated(background, types, poke_img, pokemon_name, best_name, target)
+        else:
+            fmt = "PNG"
+            frames = self.render_frames(types, poke_img, pokemon_name, best_name, background[0] if background else None)
+            frames[0].save(target, format=fmt)
+        if not in_memory:
+            return target
+        target.name = f"pokemon_spawn.{fmt.lower()}"
+        # None if another thread reloaded the config mid-render, so the card is sent but not cached
+        target.config_hash = config_hash if config_hash == self.config_hash else None
+        target.seek(0)
+        return target
+
+
+class SpawnCardCache:
+    # Memory hits are served on the event loop; the disk tier is read and written on the workers' I/O pool
+    def __init__(self, config_path, workers, max_entries=512, disk_dir=None):
+        self.config_path = config_path
+        self.workers = workers
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.config_hash = None
+        self._config_mtime = None
+        self._cards = OrderedDict()
+        self._tasks = set()
+        self.refresh_config()
+
+    def refresh_config(self):
+        try:
+            mtime = os.stat(self.config_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._config_mtime:
+            return
+        self._config_mtime = mtime
+        with open(self.config_path, 'rb') as f:
+            config_hash = hashlib.sha1(f.read()).hexdigest()[:12]
+        if config_hash == self.config_hash:
+            return
+        self.config_hash = config_hash
+        self._cards.clear()
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            for entry in os.listdir(self.disk_dir):
+                if entry != config_hash:
+                    shutil.rmtree(os.path.join(self.disk_dir, entry), ignore_errors=True)
+            os.makedirs(os.path.join(self.disk_dir, config_hash), exist_ok=True)
+
+    def make_key(self, pokemon_id, pokemon_name, best_name, types, bg_url=None):
+        self.refresh_config()
+        return (int(pokemon_id), pokemon_name, best_name, tuple(t.lower() for t in types), bg_url, self.config_hash)
+
+    def _disk_path(self, key, ext):
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.disk_dir, key[-1], f"{digest}.{ext}")
+
+    def _read_disk(self, key):
+        for ext in ("png", "gif"):
+            path = self._disk_path(key, ext)
+            try:
+                with open(path, 'rb') as f:
+                    return f"pokemon_spawn.{ext}", f.read()
+            except OSError:
+                continue
+        return None
+
+    def _write_disk(self, key, entry):
+        try:
+            with open(self._disk_path(key, entry[0].rsplit(".", 1)[-1]), 'wb') as f:
+                f.write(entry[1])
+        except OSError as e:
+            logger.warning(f"Failed to write card cache entry: {e}")
+
+    async def get(self, key):
+        entry = self._cards.get(key)
+        if entry is not None:
+            self._cards.move_to_end(key)
+        elif self.disk_dir and (entry := await self.workers.run_io(self._read_disk, key)):
+            self._store(key, entry)
+        if entry is None:
+            return None
+        name, data = entry
+        buffer = io.BytesIO(data)
+        buffer.name = name
+        return buffer
+
+    def put(self, key, card):
+        # The disk write runs in the background so the card goes out without waiting on it
+        entry = (card.name, card.getvalue())
+        self._store(key, entry)
+        if self.disk_dir:
+            task = asyncio.create_task(self._save(key, entry))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        card.seek(0)
+
+    async def _save(self, key, entry):
+        try:
+            await self.workers.run_io(self._write_disk, key, entry)
+        except Exception as e:
+            logger.warning(f"Failed to write card cache entry: {e}")
+
+    def _store(self, key, entry):
+        self._cards[key] = entry
+        self._cards.move_to_end(key)
+        while len(self._cards) > self.max_entries:
+            self._cards.popitem(last=False)
+
+
+_spawn_worker = {}
+
+
+def init_spawn_worker():
+    from submodules.poketwo_autonamer.predict import Prediction
+    _spawn_worker["predictor"] = Prediction()
+    _spawn_worker["image_builder"] = PokemonImageBuilder()
+
+
+def worker_ready():
+    return True
+
+
+def worker_predict(image_url, image_bytes=None):
+    # predict_bytes reuses the download the cog already hashed; predict(url) makes the model fetch it again
+    predictor = _spawn_worker["predictor"]
+    if image_bytes is not None and hasattr(predictor, "predict_bytes"):
+        return predictor.predict_bytes(image_bytes)
+    return predictor.predict(image_url)
+
+
+def worker_predict_batch(images):
+    return _spawn_worker["predictor"].predict_batch(images)
+
+
+def worker_can_batch():
+    return hasattr(_spawn_worker["predictor"], "predict_batch")
+
+
+def worker_create_image(**kwargs):
+    return _spawn_worker["image_builder"].create_image(**kwargs)
+
+
+class SpawnWorkerPool:
+    def __init__(self, cpu_executor="process", cpu_workers=2, io_workers=8, max_queue=32, job_timeout=20, start_timeout=120, start_method="forkserver", initializer=None, initargs=()):
+        self.cpu_executor = cpu_executor
+        self.max_queue = max_queue
+        self.job_timeout = job_timeout
+        self.start_timeout = start_timeout
+        self.start_method = start_method
+        self.initializer = initializer or init_spawn_worker
+        self.initargs = initargs
+        self.pending = 0
+        self._pending_lock = threading.Lock()
+        self.busy = {}
+        self.warming = {}
+        self.batch_support = None
+        self.io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="spawn-io")
+        if cpu_executor == "process":
+            # One single-process executor per worker, so a hung job only costs its own process
+            self.cpu_pools = [self.make_process_pool() for _ in range(cpu_workers)]
+        else:
+            self.initializer(*initargs)
+            self.cpu_pools = [ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix="spawn-cpu")]
+            self.busy[self.cpu_pools[0]] = 0
+
+    def make_process_pool(self):
+        # Not fork: the parent already runs Mongo, DNS and I/O threads, and a forked child can inherit a held lock
+        pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context(self.start_method), initializer=self.initializer, initargs=self.initargs)
+        self.busy[pool] = 0
+        self.warming[pool] = pool.submit(worker_ready)
+        self.warming[pool].add_done_callback(lambda _: self.warming.pop(pool, None))
+        return pool
+
+    def next_cpu_pool(self):
+        # Least busy worker, preferring one that has finished starting; an idle worker still loading the model
+        # beats queueing behind a busy one, since start-up time is not charged to the job
+        return min(self.cpu_pools, key=lambda pool: (self.busy.get(pool, 0), pool in self.warming))
+
+    def restart_cpu_pool(self, pool):
+        # Process jobs can't be cancelled, so a hung prediction or render only gives its worker back when the process dies
+        if self.cpu_executor != "process" or pool not in self.cpu_pools:
+            return
+        self.cpu_pools[self.cpu_pools.index(pool)] = self.make_process_pool()
+        with self._pending_lock:
+            self.busy.pop(pool, None)
+        self.warming.pop(pool, None)
+        processes = list((pool._processes or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        logger.warning("Replaced a stuck spawn CPU worker")
+
+    def _release(self, pool):
+        with self._pending_lock:
+            self.pending -= 1
+            if pool in self.busy:
+                self.busy[pool] -= 1
+
+    async def submit(self, pool, fn, *args, timeout=None, **kwargs):
+        # The slot is held until the executor job itself finishes, not just until we stop waiting for it
+        with self._pending_lock:
+            if self.pending >= self.max_queue:
+                raise asyncio.QueueFull(f"Spawn worker queue is full ({self.max_queue} jobs)")
+            self.pending += 1
+            if pool in self.busy:
+                self.busy[pool] += 1
+        try:
+            # Worker start-up (model load) is waited for separately and never counts against job_timeout
+            if (warmup := self.warming.get(pool)) is not None:
+                await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(warmup)), self.start_timeout)
+            job = pool.submit(fn, *args, **kwargs)
+        except BaseException as e:
+            self._release(pool)
+            if isinstance(e, (asyncio.TimeoutError, BrokenProcessPool)):
+                self.restart_cpu_pool(pool)
+            raise
+        job.add_done_callback(lambda _: self._release(pool))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(job), timeout or self.job_timeout)
+        except (asyncio.TimeoutError, BrokenProcessPool):
+            self.restart_cpu_pool(pool)
+            raise
+
+    async def run_cpu(self, fn, *args, **kwargs):
+        return await self.submit(self.next_cpu_pool(), fn, *args, **kwargs)
+
+    async def run_io(self, fn, *args, **kwargs):
+        return await self.submit(self.io_pool, fn, *args, **kwargs)
+
+    async def predict(self, image_url, image_bytes=None):
+        return await self.run_cpu(worker_predict, image_url, image_bytes)
+
+    async def predict_batch(self, images):
+        return await self.run_cpu(worker_predict_batch, images)
+
+    async def can_batch(self):
+        if self.batch_support is None:
+            self.batch_support = await self.run_cpu(worker_can_batch)
+        return self.batch_support
+
+    async def create_image(self, **kwargs):
+        return await self.run_cpu(worker_create_image, **kwargs)
+
+    def shutdown(self):
+        self.io_pool.shutdown(wait=False, cancel_futures=True)
+        for pool in self.cpu_pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+class Histogram:
+    def __init__(self, bounds):
+        self.bounds = sorted(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, q):
+        # Linear interpolation inside the bucket, whose edges are clamped to the observed min/max
+        if not self.count:
+            return 0.0
+        target, running = q * self.count, 0
+        for i, count in enumerate(self.counts):
+            if count and running + count >= target:
+                lower = max(self.bounds[i - 1] if i else 0.0, self.min)
+                upper = min(self.bounds[i], self.max) if i < len(self.bounds) else self.max
+                return lower + (upper - lower) * (target - running) / count
+            running += count
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "max": self.max
+        }
+
+
+LATENCY_BUCKETS = tuple(0.001 * 1.25 ** i for i in range(50))  # 1 ms to ~56 s, each bucket 25% wider than the last
+
+
+class NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_STAGE = NullStage()
+
+
+class Stage:
+    __slots__ = ("metrics", "name", "start")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # A stage cut short by an error or cancellation is counted, not timed, so it can't drag the percentiles down
+        if exc_type is None:
+            self.metrics.observe(self.name, time.perf_counter() - self.start)
         else:
-            frames[0].save(filepath, save_all=True, append_images=frames[1:], duration=durations, loop=0, disposal=2, transparency=0)
+            self.metrics.abort(self.name, issubclass(exc_type, asyncio.CancelledError))
+        return False
+
+
+class StageMetrics:
+    # Per-stage latency histograms of completed runs, plus failed/cancelled counts; disabled metrics hand out one shared no-op context
+    def __init__(self, enabled=True, bounds=LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.bounds = bounds
+        self.histograms = {}
+        self.aborted = {}
+
+    def stage(self, name):
+        return Stage(self, name) if self.enabled else NULL_STAGE
+
+    def observe(self, name, seconds):
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(self.bounds)
+        self.histograms[name].observe(seconds)
+
+    def abort(self, name, cancelled=False):
+        counts = self.aborted.setdefault(name, {"failed": 0, "cancelled": 0})
+        counts["cancelled" if cancelled else "failed"] += 1
+
+    def summary(self):
+        empty = {"failed": 0, "cancelled": 0}
+        return {
+            name: {**self.histograms.get(name, Histogram(self.bounds)).summary(), **self.aborted.get(name, empty)}
+            for name in {**self.histograms, **self.aborted}
+        }
+
+    def reset(self):
+        self.histograms.clear()
+        self.aborted.clear()
+
+
+class PredictionBatcher:
+    def __init__(self, workers, max_batch=8, max_wait=0.01):
+        self.workers = workers
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batch_sizes = Histogram(range(1, max_batch + 1))
+        self.queue_wait = Histogram(LATENCY_BUCKETS)
+        self._queue = []
+        self._timer = None
+        self._tasks = set()
+
+    async def predict(self, image_url, image_bytes=None):
+        # Without a batched model call a batch would just run predictions back to back in one CPU job;
+        # predict_batch takes image bytes, so an image that failed to download goes alone by URL
+        if image_bytes is None or not await self.workers.can_batch():
+            return await self.workers.predict(image_url, image_bytes)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((image_bytes, future, loop.time()))
+        if len(self._queue) >= self.max_batch:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self.flush)
+        return await future
+
+    def flush(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue:
+            batch, self._queue = self._queue[:self.max_batch], self._queue[self.max_batch:]
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        now = asyncio.get_running_loop().time()
+        for _, _, enqueued in batch:
+            self.queue_wait.observe(now - enqueued)
+        self.batch_sizes.observe(len(batch))
+        try:
+            results = await self.workers.predict_batch([image_bytes for image_bytes, _, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future, _), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        return {"batch_size": self.batch_sizes.summary(), "queue_wait": self.queue_wait.summary()}
+
+
+class SpawnPipeline:
+    # Each stage is started immediately and awaits only the stages it names, so independent work overlaps;
+    # close() cancels whatever is still running once the reply is out or the spawn fails
+    def __init__(self):
+        self.tasks = {}
+
+    def add(self, name, fn, *deps):
+        self.tasks[name] = asyncio.create_task(self._run(fn, deps))
+        return self
+
+    async def _run(self, fn, deps):
+        return await fn(*[await self.tasks[dep] for dep in deps])
+
+    async def result(self, name):
+        return await self.tasks[name]
+
+    def close(self):
+        for task in self.tasks.values():
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()
+
+
+class SpawnScheduler:
+    # Bounded queue between on_message and the spawn pipeline; a reply is worthless once the spawn is caught,
+    # so a full queue sheds its oldest spawn and anything past the deadline is dropped
+    def __init__(self, handler, workers=4, max_queue=64, deadline=20.0, degrade_after=8.0):
+        self.handler = handler
+        self.workers = workers
+        self.max_queue = max_queue
+        self.deadline = deadline
+        self.degrade_after = degrade_after
+        self.queue = asyncio.Queue()
+        self.active = 0
+        self.queue_wait = Histogram(LATENCY_BUCKETS)
+        self.counts = dict.fromkeys(("submitted", "completed", "degraded", "shed_full", "shed_expired", "timed_out", "failed"), 0)
+        self._tasks = set()
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = {asyncio.create_task(self._worker()) for _ in range(self.workers)}
+
+    def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = set()
+
+    def submit(self, *args):
+        if self.queue.qsize() >= self.max_queue:
+            self.queue.get_nowait()
+            self.counts["shed_full"] += 1
+        self.queue.put_nowait((asyncio.get_running_loop().time(), args))
+        self.counts["submitted"] += 1
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            enqueued, args = await self.queue.get()
+            waited = loop.time() - enqueued
+            self.queue_wait.observe(waited)
+            if waited >= self.deadline:
+                self.counts["shed_expired"] += 1
+                continue
+            degraded = waited >= self.degrade_after
+            self.active += 1
+            try:
+                await asyncio.wait_for(self.handler(*args, degraded=degraded), self.deadline - waited)
+                self.counts["degraded" if degraded else "completed"] += 1
+            except asyncio.TimeoutError:
+                self.counts["timed_out"] += 1
+                logger.warning(f"Spawn dropped after missing its {self.deadline}s deadline")
+            except Exception as e:
+                self.counts["failed"] += 1
+                logger.error(f"Spawn scheduler handler failed: {type(e).__name__}: {e}")
+            finally:
+                self.active -= 1
+
+    def summary(self):
+        return {"queue_depth": self.queue.qsize(), "active": self.active, **self.counts, "queue_wait": self.queue_wait.summary()}
+
+    def reset(self):
+        self.counts = dict.fromkeys(self.counts, 0)
+        self.queue_wait = Histogram(LATENCY_BUCKETS)
+
+
+class SpawnInfoButton(discord.ui.DynamicItem[discord.ui.Button], template=r"spawn:info:(?P<slug>[^:]*):(?P<confidence>[0-9.]*)"):
+    # Routed by custom_id rather than a stored view, so spawn buttons cost no memory and survive restarts
+    def __init__(self, slug, confidence=None):
+        self.slug = slug.replace(":", "")[:80]
+        try:
+            self.confidence = f"{float(confidence):.2f}"
+        except (TypeError, ValueError):
+            self.confidence = ""
+        super().__init__(discord.ui.Button(label="Info", style=discord.ButtonStyle.primary, custom_id=f"spawn:info:{self.slug}:{self.confidence}"))
+
+    @classmethod
+    async def from_custom_id(cls, interaction, item, match):
+        return cls(match["slug"], match["confidence"])
+
+    async def callback(self, interaction):
+        cog = interaction.client.get_cog("PoketwoSpawnDetector")
+        if cog is None:
+            return await interaction.response.send_message("Spawn info is unavailable right now.", ephemeral=True)
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        attachments = interaction.message.attachments if interaction.message else []
+        embed = await cog.build_info_embed(self.slug, self.confidence, attachments[0].url if attachments else None)
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+
+class SpawnRecorder:
+    # Appends live spawns to a replay file for benchmarks/spawn_replay.py, saving each image beside it
+    def __init__(self, path, http_client, workers):
+        self.path = path
+        self.http_client = http_client
+        self.workers = workers
+        self.image_dir = os.path.join(os.path.dirname(path) or ".", "images")
+        self.recorded = 0
+        self._tasks = set()
+        os.makedirs(self.image_dir, exist_ok=True)
+
+    def record(self, message, image_url, slug, confidence):
+        event = {
+            "guild_id": message.guild.id,
+            "channel_id": message.channel.id,
+            "message_id": message.id,
+            "slug": slug,
+            "confidence": confidence,
+            "ts": time.time(),
+        }
+        task = asyncio.create_task(self._record(event, image_url))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _record(self, event, image_url):
+        try:
+            data = await self.http_client.read(image_url)
+            await self.workers.run_io(self.write, event, data, os.path.splitext(image_url.split("?")[0])[1] or ".png")
+        except Exception as e:
+            logger.warning(f"Failed to record spawn {image_url}: {e}")
+
+    def write(self, event, data, ext):
+        name = hashlib.sha1(data).hexdigest() + ext
+        image_path = os.path.join(self.image_dir, name)
+        if not os.path.exists(image_path):
+            with open(image_path, 'wb') as f:
+                f.write(data)
+        event["image"] = os.path.relpath(image_path, os.path.dirname(self.path) or ".")
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(event) + "\n")
+        self.recorded += 1
+
+
+class PredictionCache:
+    def __init__(self, max_entries=4096, mode="sha256", max_distance=4, snapshot_path=None, snapshot_every=50):
+        self.max_entries = max_entries
+        self.mode = mode
+        self.max_distance = max_distance
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._unsaved = 0
+
+    def key(self, image_bytes):
+        if self.mode != "dhash":
+            return hashlib.sha256(image_bytes).hexdigest()
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            pixels = list(img.convert("L").resize((9, 8), Image.BILINEAR).getdata())
+        bits = 0
+        for row in range(8):
+            for col in range(8):
+                bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+        return f"{bits:016x}"
+
+    def get(self, key):
+        result = self._entries.get(key)
+        if result is None and self.mode == "dhash":
+            target = int(key, 16)
+            key = next((k for k in reversed(self._entries) if (int(k, 16) ^ target).bit_count() <= self.max_distance), None)
+            result = self._entries.get(key) if key else None
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return result
+
+    def put(self, key, result):
+        self._entries[key] = tuple(result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._unsaved += 1
+        return self.snapshot_path and self._unsaved >= self.snapshot_every
+
+    def load(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return self
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("mode") == self.mode:
+                for key, result in data.get("entries", [])[-self.max_entries:]:
+                    self._entries[key] = tuple(result)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Failed to load prediction cache snapshot: {e}")
+        return self
+
+    def save(self):
+        if not self.snapshot_path:
+            return
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        entries = list(self._entries.items())
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"mode": self.mode, "entries": entries}, f)
+        os.replace(tmp_path, self.snapshot_path)
+        self._unsaved = 0
 
+    def stats(self):
+        total = self.hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,82 @@
+import aiohttp
+import requests
+from contextlib import asynccontextmanager
+from requests.adapters import HTTPAdapter
+
+
+class HTTPClient:
+    def __init__(self, limit=100, limit_per_host=20, dns_ttl=300, keepalive_timeout=30, total_timeout=15, connect_timeout=5):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+        self._session = None
+        self.closed = False
+
+    @property
+    def session(self):
+        # Once close() has run, a late request fails like it would on a closed aiohttp session instead of leaking a new one
+        if self.closed:
+            raise RuntimeError("HTTPClient is closed")
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    def get(self, url, **kwargs):
+        return self.session.get(url, **kwargs)
+
+    async def read(self, url, **kwargs):
+        async with self.session.get(url, **kwargs) as resp:
+            resp.raise_for_status()
+            return await resp.read()
+
+    async def close(self):
+        self.closed = True
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+
+class SessionDefaults:
+    # ClientSession options such as timeout or headers, applied per request on top of a shared session
+    def __init__(self, session, **options):
+        self.session = session
+        self.options = options
+
+    def request(self, method, url, **kwargs):
+        return self.session.request(method, url, **{**self.options, **kwargs})
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request("HEAD", url, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+
+@asynccontextmanager
+async def shared_session(http_client=None, **kwargs):
+    if http_client:
+        yield SessionDefaults(http_client.session, **kwargs) if kwargs else http_client.session
+        return
+    async with aiohttp.ClientSession(**kwargs) as session:
+        yield session
+
+
+def pooled_requests_session(pool_maxsize=16, retries=1):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_maxsize, pool_maxsize=pool_maxsize, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
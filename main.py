@@ -19,6 +19,8 @@ from rich.align import Align
 from rich.console import Console
 from dotenv import load_dotenv
 from bot.token import get_bot_token, prefix, use_test_bot as ut
+from lib.config.bot import http_config
+from lib.utils.http import HTTPClient, shared_session
 from lib.imports.discord import *
 from lib.imports.logger import *
 
@@ -41,10 +43,12 @@ class BotSetup(commands.AutoShardedBot):
             heartbeat_timeout=120,
         )
         self.cog_dirs = ['bot.cogs', 'bot.events']
+        self.http_client = HTTPClient(**http_config)
+        self.metrics = {}
 
     async def on_ready(self):
         try:
-            art = AvatarToTextArt(self.user.avatar)
+            art = AvatarToTextArt(self.user.avatar, data=await self.http_client.read(str(self.user.display_avatar)))
             art.create_art()
             g = self.guilds
             term = __import__('shutil').get_terminal_size().columns
@@ -65,6 +69,10 @@ class BotSetup(commands.AutoShardedBot):
     async def on_resumed(self):
         print("✅ Bot session successfully resumed.")
 
+    async def close(self):
+        await self.http_client.close()
+        await super().close()
+
     async def start_bot(self):
         await self.setup()
         try:
@@ -122,6 +130,7 @@ class BotSetup(commands.AutoShardedBot):
 
 INDEX_HTML_PATH = os.path.join("bot", "website", "index.html")
 STATIC_HTML_DIR = os.path.join("bot", "website")
+BOT_KEY = web.AppKey("bot", BotSetup)
 
 async def handle_index(request):
     if os.path.exists(INDEX_HTML_PATH):
@@ -129,9 +138,17 @@ async def handle_index(request):
             return web.Response(text=f.read(), content_type='text/html')
     return web.Response(text="⚠️ index.html not found.", content_type='text/plain', status=404)
 
-async def start_web_server(port: int = 8080, ut: bool = False):
+async def handle_metrics(request):
+    bot = request.app.get(BOT_KEY)
+    metrics = getattr(bot, "metrics", {})
+    return web.json_response({name: source.summary() for name, source in metrics.items()})
+
+async def start_web_server(port: int = 8080, ut: bool = False, bot=None):
     app = web.Application()
+    if bot:
+        app[BOT_KEY] = bot
     app.router.add_get("/", handle_index)
+    app.router.add_get("/metrics", handle_metrics)
     app.router.add_static('/html/', path=STATIC_HTML_DIR, name='html')
     runner = web.AppRunner(app)
     await runner.setup()
@@ -140,12 +157,12 @@ async def start_web_server(port: int = 8080, ut: bool = False):
     return runner, site
 
 
-async def periodic_ping(host, port):
+async def periodic_ping(host, port, http_client):
     backoff = 5
     max_backoff = 60
     while True:
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session(http_client) as session:
                 async with session.get(f"http://{host}:{port}") as resp:
                     if resp.status == 200:
                         #logger.debug("Ping successful!")
@@ -167,10 +184,10 @@ async def start_all_services():
     runner = site = None
     try:
         bot = BotSetup()
-        runner, site = await start_web_server()
+        runner, site = await start_web_server(bot=bot)
         port = site._server.sockets[0].getsockname()[1]
         print(f"Web server started on port {port}")
-        await asyncio.gather(bot.start_bot(), periodic_ping("localhost", port))
+        await asyncio.gather(bot.start_bot(), periodic_ping("localhost", port, bot.http_client))
     except Exception as e:
         traceback.print_exc()
         logger.error(f"Fatal error: {e}\n{traceback.format_exc()}")
@@ -0,0 +1,71 @@
+import os, random
+import pytest
+from PIL import Image
+from lib.utils.events.poketwo_spawns import ArtworkStore
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    # Noise sprites so every PNG is about the same, incompressible size
+    path = tmp_path / "source"
+    path.mkdir()
+    rng = random.Random(0)
+    for pokemon_id in range(1, 9):
+        image = Image.frombytes("RGBA", (32, 32), bytes(rng.getrandbits(8) for _ in range(32 * 32 * 4)))
+        image.save(path / f"{pokemon_id}.png")
+    return path
+
+
+def make_store(tmp_path, source_dir, **kwargs):
+    return ArtworkStore(cache_dir=str(tmp_path / "cache"), base_url="http://offline.invalid/", source_dir=str(source_dir), **kwargs)
+
+
+def test_get_reads_fixture_and_caches_on_disk(tmp_path, source_dir):
+    store = make_store(tmp_path, source_dir)
+    image, content = store.get(1)
+    assert image.mode == "RGBA" and image.size == (32, 32)
+    assert content == (source_dir / "1.png").read_bytes()
+    assert os.path.exists(store.path(1))
+    os.remove(source_dir / "1.png")
+    assert make_store(tmp_path, source_dir).get(1)[1] == content
+
+
+def test_memory_lru(tmp_path, source_dir):
+    store = make_store(tmp_path, source_dir, max_memory=2)
+    first = store.get(1)
+    store.get(2)
+    assert store.get(1) is first
+    store.get(3)
+    assert list(store._images) == [1, 3]
+    assert store.get(2) is not None and list(store._images) == [3, 2]
+
+
+def test_disk_cap_evicts_least_recently_used(tmp_path, source_dir):
+    size = os.path.getsize(source_dir / "1.png")
+    store = make_store(tmp_path, source_dir, max_disk_bytes=int(size * 4.5), max_memory=0)
+    for pokemon_id in range(1, 5):
+        store.get(pokemon_id)
+    store.get(1)
+    store.get(5)
+    cached = {int(name[:-4]) for name in os.listdir(store.cache_dir)}
+    assert 2 not in cached and {1, 5} <= cached
+    assert sum(os.path.getsize(os.path.join(store.cache_dir, name)) for name in os.listdir(store.cache_dir)) <= store.max_disk_bytes
+    assert store._disk_bytes == sum(store._files.values())
+
+
+def test_writes_under_the_cap_do_not_rescan(tmp_path, source_dir, monkeypatch):
+    store = make_store(tmp_path, source_dir)
+    scans = []
+    monkeypatch.setattr(store, "scan", lambda: scans.append(1))
+    store.seed(range(1, 9))
+    assert not scans
+    assert store._disk_bytes == sum(os.path.getsize(store.path(pid)) for pid in range(1, 9))
+
+
+def test_seed(tmp_path, source_dir):
+    store = make_store(tmp_path, source_dir)
+    store.get(1)
+    assert store.seed([1, 2, 3, 99], workers=2) == (2, 3)
+    assert all(os.path.exists(store.path(pid)) for pid in (1, 2, 3))
+    assert not os.path.exists(store.path(99))
+    assert store.seed([1, 2, 3]) == (0, 0)